@@ -0,0 +1,77 @@
+import asyncio
+from collections import deque
+
+from app import messages
+from app.exceptions import ServiceOverloadedError
+
+
+class AdmissionGate:
+    """
+    Limits concurrent work to given size with a bounded FIFO wait queue,
+    rejects immediately once the queue is full
+    """
+
+    def __init__(
+        self, concurrency: int, queue_size: int, retry_after: int
+    ) -> None:
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.retry_after = retry_after
+        self.active = 0
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+        self._waiters: deque[asyncio.Future] = deque()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    async def __aenter__(self) -> "AdmissionGate":
+        # nobody may overtake requests which are already queued
+        if self.active < self.concurrency and not self._waiters:
+            self.active += 1
+        else:
+            if len(self._waiters) >= self.queue_size:
+                self.rejected += 1
+                raise ServiceOverloadedError(
+                    messages.SERVICE_OVERLOADED, self.retry_after
+                )
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            self.queued += 1
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    # the slot was handed over right before cancellation
+                    self.release()
+                raise
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        self.admitted += 1
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.release()
+
+    def release(self) -> None:
+        """
+        Hand the slot over to the oldest waiter, or free it
+        """
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,250 @@
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, defaultdict
+from collections.abc import AsyncIterator, Callable, Hashable
+from typing import Any, Optional
+
+try:
+    from redis import asyncio as aioredis
+except ImportError:  # optional, only needed for redis:// cache urls
+    aioredis = None
+
+
+class TTLCache:
+    """
+    Bounded in-process LRU mapping whose entries expire after ttl seconds
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        item = self._data.get(key)
+        if item is None or item[0] <= time.monotonic():
+            if item is not None:
+                del self._data[key]
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return item[1]
+
+    def set(
+        self, key: Hashable, value: Any, ttl: Optional[float] = None
+    ) -> None:
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def invalidate_where(
+        self, predicate: Callable[[Hashable, Any], bool]
+    ) -> int:
+        keys = [
+            key
+            for key, (_, value) in self._data.items()
+            if predicate(key, value)
+        ]
+        for key in keys:
+            del self._data[key]
+        return len(keys)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class CacheBackend(ABC):
+    """
+    Shared cache visible to every worker. Each key has a version which
+    bump() increments while dropping the value, set_if_version() writes
+    only while the version is unchanged, so a fill computed before an
+    invalidation never lands after it. Shared versions expire after
+    version_ttl_factor entry ttls, long after any fill racing them
+    """
+
+    version_ttl_factor = 10
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    async def version(self, key: str) -> int:
+        ...
+
+    @abstractmethod
+    async def set_if_version(
+        self, key: str, version: int, value: bytes, ttl: float
+    ) -> bool:
+        ...
+
+    @abstractmethod
+    async def bump(self, key: str, ttl: float) -> int:
+        ...
+
+    @abstractmethod
+    async def publish(self, channel: str, message: str) -> None:
+        ...
+
+    @abstractmethod
+    def subscribe(self, channel: str) -> AsyncIterator[str]:
+        ...
+
+    async def close(self) -> None:
+        pass
+
+    @staticmethod
+    def version_key(key: str) -> str:
+        return f"{key}:version"
+
+    def version_ttl(self, ttl: float) -> float:
+        return ttl * self.version_ttl_factor
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    In-process backend for tests and single worker runs
+    """
+
+    def __init__(self) -> None:
+        self.values: dict[str, tuple[float, bytes]] = {}
+        self.versions: dict[str, int] = {}
+        self.subscribers: dict[str, set[asyncio.Queue]] = defaultdict(set)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        item = self.values.get(key)
+        if item is None or item[0] <= time.monotonic():
+            self.values.pop(key, None)
+            return None
+        return item[1]
+
+    async def version(self, key: str) -> int:
+        return self.versions.get(self.version_key(key), 0)
+
+    async def set_if_version(
+        self, key: str, version: int, value: bytes, ttl: float
+    ) -> bool:
+        if self.versions.get(self.version_key(key), 0) != version:
+            return False
+        self.values[key] = (time.monotonic() + ttl, value)
+        return True
+
+    async def bump(self, key: str, ttl: float) -> int:
+        version = self.versions.get(self.version_key(key), 0) + 1
+        self.versions[self.version_key(key)] = version
+        self.values.pop(key, None)
+        return version
+
+    async def publish(self, channel: str, message: str) -> None:
+        for queue in self.subscribers[channel]:
+            queue.put_nowait(message)
+
+    async def subscribe(self, channel: str) -> AsyncIterator[str]:
+        queue: asyncio.Queue = asyncio.Queue()
+        self.subscribers[channel].add(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self.subscribers[channel].discard(queue)
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Backend on a Redis protocol server, needs the optional redis package
+    """
+
+    SET_IF_VERSION = """
+    if tonumber(redis.call('GET', KEYS[2]) or '0') ~= tonumber(ARGV[1]) then
+        return 0
+    end
+    redis.call('SET', KEYS[1], ARGV[2], 'PX', ARGV[3])
+    redis.call('PEXPIRE', KEYS[2], ARGV[4])
+    return 1
+    """
+
+    def __init__(self, url: str) -> None:
+        if aioredis is None:
+            raise RuntimeError("redis package is required for " + url)
+        self.client = aioredis.from_url(url)
+        self._set_if_version = self.client.register_script(self.SET_IF_VERSION)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(key)
+
+    async def version(self, key: str) -> int:
+        return int(await self.client.get(self.version_key(key)) or 0)
+
+    async def set_if_version(
+        self, key: str, version: int, value: bytes, ttl: float
+    ) -> bool:
+        written = await self._set_if_version(
+            keys=[key, self.version_key(key)],
+            args=[
+                version,
+                value,
+                int(ttl * 1000),
+                int(self.version_ttl(ttl) * 1000),
+            ],
+        )
+        return bool(written)
+
+    async def bump(self, key: str, ttl: float) -> int:
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.incr(self.version_key(key))
+            pipe.pexpire(
+                self.version_key(key), int(self.version_ttl(ttl) * 1000)
+            )
+            pipe.delete(key)
+            version, _, _ = await pipe.execute()
+        return version
+
+    async def publish(self, channel: str, message: str) -> None:
+        await self.client.publish(channel, message)
+
+    async def subscribe(self, channel: str) -> AsyncIterator[str]:
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(channel)
+        try:
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    yield message["data"].decode()
+        finally:
+            await pubsub.reset()
+
+    async def close(self) -> None:
+        await self.client.close()
+
+
+def create_cache_backend(url: str) -> Optional[CacheBackend]:
+    """
+    Backend for given url: empty disables caching, memory:// is
+    in-process, anything else is handed to redis
+    """
+    if not url:
+        return None
+    if url.startswith("memory://"):
+        return MemoryCacheBackend()
+    return RedisCacheBackend(url)
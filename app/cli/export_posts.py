@@ -0,0 +1,45 @@
+"""
+Stream all live posts to a file as NDJSON or CSV
+
+    $ python -m app.cli.export_posts --format csv --output posts.csv
+"""
+import argparse
+import asyncio
+import sys
+
+from app.configs.database import SessionFactory
+from app.repositories.post_repository import PostRepository
+from app.schemas.post_schema import ExportFormat
+from app.services.export_service import ExportService
+
+
+async def export(format: ExportFormat, chunk_size: int, output) -> None:
+    session = SessionFactory()
+    service = ExportService(PostRepository(session))
+    try:
+        async for chunk in service.export_posts(format, chunk_size):
+            output.write(chunk)
+    finally:
+        await session.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--format",
+        type=ExportFormat,
+        choices=list(ExportFormat),
+        default=ExportFormat.ndjson,
+    )
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--output", help="file path, stdout by default")
+    args = parser.parse_args()
+    if args.output is None:
+        asyncio.run(export(args.format, args.chunk_size, sys.stdout.buffer))
+        return
+    with open(args.output, "wb") as output:
+        asyncio.run(export(args.format, args.chunk_size, output))
+
+
+if __name__ == "__main__":
+    main()
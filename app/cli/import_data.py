@@ -0,0 +1,75 @@
+"""
+Bulk load users or posts from NDJSON or CSV through COPY
+
+    $ python -m app.cli.import_data users users.ndjson
+    $ python -m app.cli.import_data posts posts.csv --format csv
+"""
+import argparse
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+
+from app.configs.database import SessionFactory
+from app.configs.environment import get_environment
+from app.repositories.post_repository import PostRepository
+from app.repositories.user_repository import UserRepository
+from app.schemas.import_schema import ImportKind
+from app.schemas.post_schema import ExportFormat
+from app.services.import_service import ImportService, iter_lines
+
+log = logging.getLogger(__name__)
+
+
+async def read_chunks(path: str, size: int = 1 << 16) -> AsyncIterator[bytes]:
+    with open(path, "rb") as source:
+        while chunk := source.read(size):
+            yield chunk
+
+
+async def import_file(
+    kind: ImportKind, format: ExportFormat, path: str, batch_size: int
+) -> dict:
+    session = SessionFactory()
+    service = ImportService(UserRepository(session), PostRepository(session))
+    try:
+        return await service.import_records(
+            kind, format, iter_lines(read_chunks(path)), batch_size
+        )
+    finally:
+        await session.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("kind", type=ImportKind, choices=list(ImportKind))
+    parser.add_argument("path")
+    parser.add_argument(
+        "--format",
+        type=ExportFormat,
+        choices=list(ExportFormat),
+        default=ExportFormat.ndjson,
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=get_environment().IMPORT_BATCH_SIZE
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    report = asyncio.run(
+        import_file(args.kind, args.format, args.path, args.batch_size)
+    )
+    for batch in report["batches"]:
+        log.info(
+            "batch {batch}: received {received}, rejected {rejected}, "
+            "inserted {inserted}, validate {validate_ms}ms, "
+            "copy {copy_ms}ms, merge {merge_ms}ms".format(**batch)
+        )
+        if batch["error"]:
+            log.error(f"batch {batch['batch']} failed: {batch['error']}")
+    log.info(
+        f"done, received {report['received']}, rejected "
+        f"{report['rejected']}, inserted {report['inserted']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Recompute drifted sn_post.like_count values in batches
+
+    $ python -m app.cli.reconcile_likes --batch-size 1000
+"""
+import argparse
+import asyncio
+import logging
+
+from app.configs.database import SessionFactory
+from app.repositories.post_repository import PostRepository
+
+log = logging.getLogger(__name__)
+
+
+async def reconcile(batch_size: int) -> int:
+    session = SessionFactory()
+    repo = PostRepository(session)
+    after_id, total = 0, 0
+    try:
+        while True:
+            last_id, fixed = await repo.reconcile_like_counts(
+                after_id, batch_size
+            )
+            if last_id is None:
+                break
+            log.info(f"posts {after_id + 1}..{last_id}: fixed {fixed}")
+            after_id, total = last_id, total + fixed
+    finally:
+        await session.close()
+    return total
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    total = asyncio.run(reconcile(args.batch_size))
+    log.info(f"done, fixed {total} posts")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import hashlib
+from collections.abc import Iterable
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional
+
+from fastapi import Request, Response, status
+
+
+def weak_etag(*parts: Any) -> str:
+    """
+    Weak validator over given parts, datetimes taken with microseconds
+    """
+    raw = "|".join(
+        value.isoformat() if isinstance(value, datetime) else str(value)
+        for value in parts
+    )
+    return f'W/"{hashlib.blake2b(raw.encode(), digest_size=12).hexdigest()}"'
+
+
+def last_modified_of(
+    stamps: Iterable[Optional[datetime]],
+) -> Optional[datetime]:
+    """
+    Latest of given stamps in UTC, None if there are none
+    """
+    latest = max(
+        (stamp for stamp in stamps if stamp is not None), default=None
+    )
+    return latest.astimezone(timezone.utc) if latest is not None else None
+
+
+def entity_validators(
+    id: Any, stamp: datetime
+) -> tuple[str, Optional[datetime]]:
+    """
+    ETag and Last-Modified of a single entity version
+    """
+    return weak_etag(id, stamp), last_modified_of([stamp])
+
+
+def validator_headers(
+    etag: str, last_modified: Optional[datetime] = None
+) -> dict[str, str]:
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    return headers
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    """
+    Weak comparison of If-None-Match against etag
+    """
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in header.split(",")
+    )
+
+
+def is_not_modified(
+    request: Request, etag: str, last_modified: Optional[datetime] = None
+) -> bool:
+    """
+    Evaluate If-None-Match, or If-Modified-Since when the former is absent
+    """
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("If-Modified-Since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # http dates have no sub-second part
+    return last_modified.replace(microsecond=0) <= since
+
+
+def is_conditional(request: Request) -> bool:
+    return (
+        "If-None-Match" in request.headers
+        or "If-Modified-Since" in request.headers
+    )
+
+
+def not_modified(
+    etag: str, last_modified: Optional[datetime] = None
+) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers=validator_headers(etag, last_modified),
+    )
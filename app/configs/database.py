@@ -1,8 +1,22 @@
-from typing import AsyncIterator
+import time
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Optional
+from uuid import uuid4
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from fastapi import Depends, Request
+from sqlalchemy import event
+from sqlalchemy.engine import ExceptionContext
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    create_async_engine,
+)
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from starlette.requests import HTTPConnection
 
+from app import metrics
+from app.cache import TTLCache
 from app.configs.environment import Settings, get_environment
 
 ENV = get_environment()
@@ -16,9 +30,153 @@ def get_database_url(env: Settings) -> str:
     return database_url
 
 
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    Queue pool which keeps track of time spent waiting for a connection
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - started
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": self.overflow(),
+            "checkouts": self.checkouts,
+            "wait_avg_ms": round(self.wait_total / self.checkouts * 1000, 3)
+            if self.checkouts
+            else 0.0,
+            "wait_max_ms": round(self.wait_max * 1000, 3),
+        }
+
+
+def get_connect_args(env: Settings) -> dict[str, Any]:
+    """
+    asyncpg arguments, PgBouncer in transaction mode can not keep
+    prepared statements between transactions
+    """
+    if env.DATABASE_PGBOUNCER:
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    return {"prepared_statement_cache_size": env.DATABASE_STATEMENT_CACHE_SIZE}
+
+
+def create_engine(env: Settings) -> AsyncEngine:
+    return create_async_engine(
+        get_database_url(env),
+        echo=env.DATABASE_ECHO,
+        poolclass=InstrumentedPool,
+        pool_size=env.DATABASE_POOL_SIZE,
+        max_overflow=env.DATABASE_MAX_OVERFLOW,
+        pool_timeout=env.DATABASE_POOL_TIMEOUT,
+        pool_recycle=env.DATABASE_POOL_RECYCLE,
+        pool_pre_ping=env.DATABASE_POOL_PRE_PING,
+        connect_args=get_connect_args(env),
+    )
+
+
+def replica_settings(env: Settings, address: str) -> Settings:
+    """
+    Copy of settings pointing to a replica given as host or host:port
+    """
+    host, _, port = address.partition(":")
+    return env.copy(
+        update={
+            "DATABASE_HOST": host,
+            "DATABASE_PORT": int(port or env.DATABASE_PORT),
+        }
+    )
+
+
+class ReplicaSet:
+    """
+    Round-robin over replica engines, an engine which failed to connect
+    or lost its connection is skipped for eject_seconds
+    """
+
+    def __init__(self, engines: list[AsyncEngine], eject_seconds: int) -> None:
+        self.engines = engines
+        self.eject_seconds = eject_seconds
+        self.ejected_until = [0.0] * len(engines)
+        self.ejections = 0
+        self._next = 0
+        for index, engine in enumerate(engines):
+            event.listen(
+                engine.sync_engine, "handle_error", self.on_error(index)
+            )
+
+    def on_error(self, index: int):
+        def handle_error(context: ExceptionContext) -> None:
+            if context.is_disconnect or context.connection is None:
+                self.eject(index)
+
+        return handle_error
+
+    def eject(self, index: int) -> None:
+        self.ejected_until[index] = time.monotonic() + self.eject_seconds
+        self.ejections += 1
+
+    def choose(self) -> Optional[AsyncEngine]:
+        now = time.monotonic()
+        for _ in range(len(self.engines)):
+            index = self._next % len(self.engines)
+            self._next += 1
+            if self.ejected_until[index] <= now:
+                return self.engines[index]
+        return None
+
+    def stats(self) -> dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "ejections": self.ejections,
+            "replicas": [
+                {
+                    "host": engine.url.host,
+                    "healthy": until <= now,
+                    "pool": engine.pool.stats(),
+                }
+                for engine, until in zip(self.engines, self.ejected_until)
+            ],
+        }
+
+
 database_url = get_database_url(ENV)
 
-db_engine = create_async_engine(database_url, echo=True)
+db_engine = create_engine(ENV)
+metrics.register("database_pool", lambda: db_engine.pool.stats())
+
+replicas = ReplicaSet(
+    [
+        create_engine(replica_settings(ENV, address))
+        for address in ENV.DATABASE_REPLICA_HOSTS
+    ],
+    ENV.DATABASE_REPLICA_EJECT_SECONDS,
+)
+metrics.register("database_replicas", replicas.stats)
+
+recent_writers = TTLCache(
+    ENV.READ_YOUR_WRITES_SIZE, ENV.READ_YOUR_WRITES_WINDOW
+)
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
 
 SessionFactory = sessionmaker(
     db_engine,
@@ -29,9 +187,123 @@ SessionFactory = sessionmaker(
 )
 
 
-async def get_session() -> AsyncIterator[AsyncSession]:
+class RequestSessions:
+    """
+    Primary and replica sessions of one request, opened on first use and
+    closed by SessionMiddleware once the response is sent. Also sums how
+    long the request held pooled connections
+    """
+
+    def __init__(self) -> None:
+        self._session: Optional[AsyncSession] = None
+        self._read_session: Optional[AsyncSession] = None
+        self.checkouts = 0
+        self.held = 0.0
+        self.holding: dict[int, float] = {}
+
+    @property
+    def session(self) -> AsyncSession:
+        if self._session is None:
+            self._session = SessionFactory()
+        return self._session
+
+    @property
+    def read_session(self) -> AsyncSession:
+        if self._read_session is None:
+            self._read_session = read_session_factory()
+        return self._read_session
+
+    def hold_time(self) -> float:
+        now = time.perf_counter()
+        return self.held + sum(now - since for since in self.holding.values())
+
+    async def close(self) -> None:
+        for session in (self._session, self._read_session):
+            if session is not None:
+                await session.close()
+
+
+current_sessions: ContextVar[Optional[RequestSessions]] = ContextVar(
+    "current_sessions", default=None
+)
+
+
+def request_sessions(conn: HTTPConnection) -> Optional[RequestSessions]:
+    return conn.scope.get("state", {}).get("sessions")
+
+
+def on_checkout(dbapi_connection, record, proxy) -> None:
+    sessions = current_sessions.get()
+    if sessions is not None:
+        sessions.checkouts += 1
+        sessions.holding[id(record)] = time.perf_counter()
+
+
+def on_checkin(dbapi_connection, record) -> None:
+    sessions = current_sessions.get()
+    if sessions is not None and id(record) in sessions.holding:
+        since = sessions.holding.pop(id(record))
+        sessions.held += time.perf_counter() - since
+
+
+for engine in (db_engine, *replicas.engines):
+    event.listen(engine.sync_engine, "checkout", on_checkout)
+    event.listen(engine.sync_engine, "checkin", on_checkin)
+
+
+async def get_session(request: Request) -> AsyncIterator[AsyncSession]:
+    sessions = request_sessions(request)
+    if sessions is not None:
+        yield sessions.session
+        return
+
     session = SessionFactory()
     try:
         yield session
     finally:
         await session.close()
+
+
+def read_session_factory() -> AsyncSession:
+    """
+    Session bound to the next healthy replica, or to the primary
+    if there is none
+    """
+    engine = replicas.choose()
+    if engine is None:
+        return SessionFactory()
+    return SessionFactory(bind=engine)
+
+
+async def get_read_session(
+    request: Request, session: AsyncSession = Depends(get_session)
+) -> AsyncIterator[AsyncSession]:
+    """
+    Session for read-only queries. Writing requests, and reads of users
+    who wrote within READ_YOUR_WRITES_WINDOW, share the primary session
+    """
+    user_id = getattr(request.scope.get("user"), "id", None)
+    if request.method not in SAFE_METHODS:
+        if user_id is not None:
+            recent_writers.set(user_id, True)
+        try:
+            yield session
+        finally:
+            if user_id is not None:
+                recent_writers.set(user_id, True)
+        return
+
+    if not replicas.engines or recent_writers.get(user_id):
+        yield session
+        return
+
+    sessions = request_sessions(request)
+    if sessions is not None:
+        yield sessions.read_session
+        return
+
+    read_session = read_session_factory()
+    try:
+        yield read_session
+    finally:
+        await read_session.close()
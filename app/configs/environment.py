@@ -1,5 +1,6 @@
 from functools import lru_cache
 from pathlib import Path
+from typing import Literal
 
 from pydantic import BaseSettings
 
@@ -14,10 +15,49 @@ class Settings(BaseSettings):
     DATABASE_PASSWORD: str
     ASYNC_DRIVER: str = "postgresql+asyncpg"
     SYNC_DRIVER: str = "postgresql"
+    DATABASE_ECHO: bool = False
+    DATABASE_POOL_SIZE: int = 10
+    DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_TIMEOUT: float = 30
+    DATABASE_POOL_RECYCLE: int = 1800
+    DATABASE_POOL_PRE_PING: bool = True
+    DATABASE_STATEMENT_CACHE_SIZE: int = 100
+    DATABASE_PGBOUNCER: bool = False
+    DATABASE_REPLICA_HOSTS: list[str] = []
+    DATABASE_REPLICA_EJECT_SECONDS: int = 30
+    READ_YOUR_WRITES_WINDOW: int = 5
+    READ_YOUR_WRITES_SIZE: int = 10000
+    REPOSITORY_AUTOCOMMIT: bool = False
+    REFRESH_TOKEN_SWEEP_INTERVAL: int = 300
+    REFRESH_TOKEN_SWEEP_BATCH: int = 1000
     SECRET_KEY: str
     HASH_ALGORITHM: str
     ACCESS_TOKEN_LIFETIME: int
     REFRESH_TOKEN_LIFETIME: int
+    COUNT_CACHE_TTL: int = 30
+    COUNT_CACHE_SIZE: int = 256
+    PRINCIPAL_CACHE_TTL: int = 60
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    TOKEN_CACHE_SIZE: int = 10000
+    STATELESS_AUTH: bool = False
+    DENYLIST_REFRESH_INTERVAL: int = 30
+    PASSWORD_EXECUTOR: Literal["thread", "process"] = "thread"
+    PASSWORD_WORKERS: int = 4
+    AUTH_MAX_CONCURRENCY: int = 4
+    AUTH_MAX_QUEUE: int = 16
+    AUTH_RETRY_AFTER: int = 1
+    LIKE_WRITE_BEHIND: bool = False
+    LIKE_BUFFER_MAX_SIZE: int = 1000
+    LIKE_BUFFER_FLUSH_INTERVAL: float = 1.0
+    LIKE_BUFFER_MAX_PENDING: int = 100000
+    FEED_FANOUT_THRESHOLD: int = 10000
+    FEED_BACKFILL_SIZE: int = 50
+    ADMIN_LOGINS: list[str] = []
+    IMPORT_BATCH_SIZE: int = 5000
+    POST_CACHE_URL: str = ""
+    POST_CACHE_TTL: float = 300
+    POST_CACHE_LOCAL_SIZE: int = 10000
+    POST_CACHE_LOCAL_TTL: float = 5
 
     class Config:
         env_file = BASE_DIR / ".env"
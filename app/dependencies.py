@@ -1,6 +1,7 @@
 from fastapi import HTTPException, Request, status
 
-from app.messages import NOT_AUTHENTICATED
+from app.configs.environment import get_environment
+from app.messages import NO_PERMISSION, NOT_AUTHENTICATED
 
 
 async def check_authenticated(request: Request):
@@ -8,3 +9,9 @@ async def check_authenticated(request: Request):
         raise HTTPException(
             status.HTTP_401_UNAUTHORIZED, detail=NOT_AUTHENTICATED
         )
+
+
+async def check_admin(request: Request):
+    await check_authenticated(request)
+    if request.user.login not in get_environment().ADMIN_LOGINS:
+        raise HTTPException(status.HTTP_403_FORBIDDEN, detail=NO_PERMISSION)
@@ -1,2 +1,12 @@
 class InvalidTokenError(Exception):
     ...
+
+
+class InvalidCursorError(Exception):
+    ...
+
+
+class ServiceOverloadedError(Exception):
+    def __init__(self, message: str, retry_after: int) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
@@ -6,3 +6,6 @@ SUCCESSFULLY_REGISTERED = "Successfully registered!"
 NO_PERMISSION = "You have no permission!"
 ACTION_NOT_ALLOWED = "Cannot do this operation on this object!"
 NOT_AUTHENTICATED = "Authentication required!"
+INVALID_CURSOR = "Given cursor is INVALID!"
+SERVICE_OVERLOADED = "Service is overloaded, try again later!"
+INVALID_FIELDS = "Given fields are INVALID!"
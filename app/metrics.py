@@ -0,0 +1,15 @@
+from collections.abc import Callable
+from typing import Any
+
+collectors: dict[str, Callable[[], Any]] = {}
+
+
+def register(name: str, collector: Callable[[], Any]) -> None:
+    """
+    Register callable returning current stats under given name
+    """
+    collectors[name] = collector
+
+
+def collect() -> dict[str, Any]:
+    return {name: collector() for name, collector in collectors.items()}
@@ -1,8 +1,10 @@
+import hashlib
 import logging
 import typing
 from datetime import datetime
 
 from jose import ExpiredSignatureError, JWTError, jwt
+from sqlalchemy.ext.asyncio import AsyncSession
 from starlette.authentication import (
     AuthCredentials,
     AuthenticationBackend,
@@ -10,20 +12,37 @@ from starlette.authentication import (
 )
 from starlette.requests import HTTPConnection
 
-from app.configs.database import SessionFactory
+from app import metrics
+from app.cache import TTLCache
+from app.configs.database import (
+    RequestSessions,
+    SessionFactory,
+    read_session_factory,
+    replicas,
+    request_sessions,
+)
 from app.configs.environment import get_environment
 from app.models.user_model import User
 from app.repositories.user_repository import UserRepository
+from app.services.principal_service import Principal, principal_cache
+from app.services.revocation_service import denylist
 
 log = logging.getLogger(__name__)
 
+settings = get_environment()
+
+token_cache = TTLCache(
+    settings.TOKEN_CACHE_SIZE, settings.ACCESS_TOKEN_LIFETIME * 60
+)
+metrics.register("token_cache", token_cache.stats)
+
 
 class JWTAuthentication(AuthenticationBackend):
     settings = get_environment()
 
     async def authenticate(
         self, conn: HTTPConnection
-    ) -> typing.Optional[typing.Tuple["AuthCredentials", "User"]]:
+    ) -> typing.Optional[typing.Tuple["AuthCredentials", "Principal"]]:
         credentials = conn.headers.get("Authorization")
         if credentials is None:
             return AuthCredentials(["authenticated"]), None
@@ -33,11 +52,7 @@ class JWTAuthentication(AuthenticationBackend):
             log.warning("ERROR: scheme is incorrect")
             raise AuthenticationError("Incorrect token type!")
         try:
-            payload = jwt.decode(
-                token,
-                self.settings.SECRET_KEY,
-                algorithms=self.settings.HASH_ALGORITHM,
-            )
+            payload = self.decode(token)
             login = payload.get("user")
             if login is None:
                 log.warning("ERROR: something went wrong!")
@@ -51,14 +66,74 @@ class JWTAuthentication(AuthenticationBackend):
             log.warning(f"ERROR: {e}")
             raise AuthenticationError("Failed to decode JWT!") from e
 
-        session = SessionFactory()
-        repo = UserRepository(session)
+        if (
+            self.settings.STATELESS_AUTH
+            and "jti" in payload
+            and "uid" in payload
+        ):
+            if payload["jti"] in denylist:
+                raise AuthenticationError("Token is revoked!")
+            principal = Principal(id=payload["uid"], login=login)
+            return AuthCredentials(["authenticated"]), principal
 
-        try:
-            user: User = await repo.get_by_login(login=login)
-        except Exception:
-            await session.close()
+        principal = principal_cache.get(login)
+        if principal is not None:
+            return AuthCredentials(["authenticated"]), principal
+
+        user = await self.load_user(login, request_sessions(conn))
+        if user is None:
             raise AuthenticationError("Unable to authenticated!")
+        principal = Principal.from_user(user, login)
+        principal_cache.set(login, principal)
+        return AuthCredentials(["authenticated"]), principal
+
+    async def load_user(
+        self, login: str, sessions: typing.Optional[RequestSessions]
+    ) -> typing.Optional[User]:
+        """
+        Look the login up with the request sessions, or with own short
+        lived ones outside of SessionMiddleware. A fresh registration may
+        not have reached the replica yet, so a miss is retried on primary
+        """
+        factories: tuple[typing.Callable[[], AsyncSession], ...]
+        if sessions is not None:
+            factories = (lambda: sessions.session,)
+            if replicas.engines:
+                factories = (lambda: sessions.read_session, *factories)
         else:
-            await session.close()
-            return AuthCredentials(["authenticated"]), user
+            factories = (SessionFactory,)
+            if replicas.engines:
+                factories = (read_session_factory, SessionFactory)
+
+        for session_factory in factories:
+            session = session_factory()
+            try:
+                return await UserRepository(session).get_by_login(login=login)
+            except Exception:
+                await session.rollback()
+            finally:
+                if sessions is None:
+                    await session.close()
+        return None
+
+    def decode(self, token: str) -> dict:
+        """
+        Verify and decode token once, then serve the payload from cache
+        until the token's own expiration_date
+        """
+        key = hashlib.sha256(token.encode()).digest()
+        payload = token_cache.get(key)
+        if payload is not None:
+            return payload
+
+        payload = jwt.decode(
+            token,
+            self.settings.SECRET_KEY,
+            algorithms=self.settings.HASH_ALGORITHM,
+        )
+        ttl = (payload.get("expiration_date") or 0) - datetime.timestamp(
+            datetime.utcnow()
+        )
+        if ttl > 0:
+            token_cache.set(key, payload, ttl=ttl)
+        return payload
@@ -0,0 +1,74 @@
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app import metrics
+from app.configs.database import RequestSessions, current_sessions
+
+
+class ConnectionHoldStats:
+    """
+    Connection hold time per request, over all finished requests
+    """
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.checkouts = 0
+        self.held = 0.0
+        self.held_max = 0.0
+
+    def record(self, sessions: RequestSessions) -> None:
+        held = sessions.hold_time()
+        self.requests += 1
+        self.checkouts += sessions.checkouts
+        self.held += held
+        self.held_max = max(self.held_max, held)
+
+    def stats(self) -> dict[str, float]:
+        requests = self.requests or 1
+        return {
+            "requests": self.requests,
+            "checkouts_per_request": round(self.checkouts / requests, 3),
+            "hold_avg_ms": round(self.held / requests * 1000, 3),
+            "hold_max_ms": round(self.held_max * 1000, 3),
+        }
+
+
+hold_stats = ConnectionHoldStats()
+metrics.register("request_connections", hold_stats.stats)
+
+
+class SessionMiddleware:
+    """
+    Give each http request one lazily opened set of sessions, shared by
+    the authentication middleware and repository dependencies, and close
+    it right after the response. Connection hold time up to the start of
+    the response is sent in the Server-Timing header
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        sessions = RequestSessions()
+        scope.setdefault("state", {})["sessions"] = sessions
+        token = current_sessions.set(sessions)
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    f"db;dur={sessions.hold_time() * 1000:.3f}",
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            await sessions.close()
+            current_sessions.reset(token)
+            hold_stats.record(sessions)
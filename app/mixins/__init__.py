@@ -1,25 +1,167 @@
-from typing import Dict, Sequence
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Sequence
 
+from fastapi import HTTPException, status
 from sqlalchemy import BaseRow
 
+from app import messages
+from app.exceptions import InvalidCursorError
 from app.repositories.base_repository import BaseSqlAlchemyRepository
+from app.schemas.base_schema import CountMode
 from app.schemas.post_schema import PostSchema
 
 
+def encode_cursor(*values: Any) -> str:
+    """
+    Pack keyset values into an opaque url-safe string
+    """
+    raw = json.dumps(
+        [v.isoformat() if isinstance(v, datetime) else v for v in values],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *types: type) -> tuple:
+    """
+    Unpack cursor made by encode_cursor, casting values to given types
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError(cursor)
+        return tuple(
+            datetime.fromisoformat(value)
+            if type_ is datetime
+            else type_(value)
+            for type_, value in zip(types, values)
+        )
+    except (ValueError, TypeError, binascii.Error) as e:
+        raise InvalidCursorError(messages.INVALID_CURSOR) from e
+
+
+def parse_keyset_cursor(
+    cursor: Optional[str], *types: type
+) -> Optional[tuple]:
+    """
+    Decode cursor of a keyset page, (created_at, id) unless other
+    types are given. 400 if malformed
+    """
+    if not cursor:
+        return None
+    try:
+        return decode_cursor(cursor, *(types or (datetime, int)))
+    except InvalidCursorError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)
+        )
+
+
+def parse_fields(
+    fields: Optional[str], allowed: Iterable[str]
+) -> tuple[str, ...]:
+    """
+    Split comma separated projection fields, keeping their order.
+    400 if any of them is unknown
+    """
+    if not fields:
+        return ()
+    names = tuple(dict.fromkeys(name.strip() for name in fields.split(",")))
+    if not set(names) <= set(allowed):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=messages.INVALID_FIELDS,
+        )
+    return names
+
+
+def serialize_rows(
+    data: Sequence[BaseRow], fields: Sequence[str] = ()
+) -> list[Dict]:
+    """
+    Entities through PostSchema, projected rows as plain dicts
+    of the requested fields
+    """
+    if fields:
+        return [
+            {field: row._mapping[field] for field in fields} for row in data
+        ]
+    return [PostSchema.from_orm(item).dict() for item in data]
+
+
+def keyset_page(
+    data: Sequence[BaseRow], limit: int, fields: Sequence[str] = ()
+) -> Dict:
+    """
+    Build cursor page from limit + 1 rows fetched by (created_at, id)
+    """
+    next_cursor = None
+    if len(data) > limit:
+        data = data[:limit]
+        next_cursor = encode_cursor(data[-1].created_at, data[-1].id)
+    return {
+        "count": None,
+        "limit": limit,
+        "offset": None,
+        "next_cursor": next_cursor,
+        "data": serialize_rows(data, fields),
+    }
+
+
+def offset_page(
+    data: Sequence[BaseRow],
+    count: int,
+    count_mode: CountMode,
+    limit: int,
+    offset: int,
+    fields: Sequence[str] = (),
+) -> Dict:
+    return {
+        "count": count,
+        "count_mode": count_mode,
+        "limit": limit,
+        "offset": offset,
+        "data": serialize_rows(data, fields),
+    }
+
+
 class PaginationMixin:
 
     repository: BaseSqlAlchemyRepository
 
     async def get_paginated(
-        self, offset: int = 0, limit: int = 20, *clauses: Sequence
+        self,
+        offset: int = 0,
+        limit: int = 20,
+        *clauses: Sequence,
+        count_mode: CountMode = CountMode.exact,
+        fields: Sequence[str] = (),
     ) -> Dict:
-        count = await self.repository.count(*clauses)
+        count, count_mode = await self.repository.count_by(
+            count_mode, *clauses
+        )
         data: Sequence[BaseRow] = await self.repository.all(
-            limit, offset, *clauses
+            limit, offset, *clauses, fields=fields
+        )
+        return offset_page(data, count, count_mode, limit, offset, fields)
+
+    async def get_cursor_paginated(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 20,
+        *clauses: Sequence,
+        fields: Sequence[str] = (),
+    ) -> Dict:
+        # the cursor is made of (created_at, id) of the last row
+        selected = tuple(dict.fromkeys((*fields, "created_at", "id")))
+        data: Sequence[BaseRow] = await self.repository.seek(
+            limit + 1,
+            parse_keyset_cursor(cursor),
+            *clauses,
+            fields=selected if fields else (),
         )
-        return {
-            "count": count,
-            "limit": limit,
-            "offset": offset,
-            "data": [PostSchema.from_orm(item).dict() for item in data],
-        }
+        return keyset_page(data, limit, fields)
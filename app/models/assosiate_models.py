@@ -1,4 +1,6 @@
-from sqlalchemy import Column, ForeignKey, Table
+from datetime import datetime
+
+from sqlalchemy import DATETIME, Column, ForeignKey, Index, Table
 
 from app.models.base_model import BaseAbstractModel
 
@@ -8,3 +10,43 @@ Like = Table(
     Column("post_id", ForeignKey("sn_post.id"), primary_key=True),
     Column("user_id", ForeignKey("sn_user.id"), primary_key=True),
 )
+
+Follow = Table(
+    "sn_follow",
+    BaseAbstractModel.metadata,
+    Column(
+        "follower_id",
+        ForeignKey("sn_user.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    Column(
+        "followee_id",
+        ForeignKey("sn_user.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    Column("created_at", DATETIME(True), default=datetime.now),
+    Index("ix_sn_follow_followee_id", "followee_id", "follower_id"),
+)
+
+Timeline = Table(
+    "sn_timeline",
+    BaseAbstractModel.metadata,
+    Column(
+        "user_id",
+        ForeignKey("sn_user.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    Column(
+        "post_id",
+        ForeignKey("sn_post.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    Column("created_at", DATETIME(True), nullable=False),
+    Index("ix_sn_timeline_post_id", "post_id"),
+)
+Index(
+    "ix_sn_timeline_user_created_at",
+    Timeline.c.user_id,
+    Timeline.c.created_at.desc(),
+    Timeline.c.post_id.desc(),
+)
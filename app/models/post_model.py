@@ -1,9 +1,23 @@
-from sqlalchemy import ForeignKey, Integer, String, Text
+from sqlalchemy import (
+    Boolean,
+    Computed,
+    ForeignKey,
+    Integer,
+    String,
+    Text,
+    false,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.assosiate_models import Like
 from app.models.base_model import BaseAbstractModel
 
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(header, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(body, '')), 'B')"
+)
+
 
 class Post(BaseAbstractModel):
     __tablename__ = "sn_post"
@@ -12,6 +26,16 @@ class Post(BaseAbstractModel):
     header: Mapped[str] = mapped_column(String(100), nullable=False)
     body: Mapped[str] = mapped_column(Text, nullable=False)
     owner: Mapped[int] = mapped_column(Integer, ForeignKey("sn_user.id"))
+    like_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    # pushed to follower timelines on create, otherwise pulled on read
+    fanned_out: Mapped[bool] = mapped_column(
+        Boolean, nullable=False, default=False, server_default=false()
+    )
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR, Computed(SEARCH_VECTOR, persisted=True), deferred=True
+    )
 
     liked_users: Mapped[set["User"]] = relationship(  # noqa
         secondary=Like, back_populates="likes"
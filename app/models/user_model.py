@@ -16,6 +16,9 @@ class User(BaseAbstractModel):
     first_name: Mapped[str] = mapped_column(String(50), nullable=False)
     last_name: Mapped[str] = mapped_column(String(50), nullable=False)
     birth_date: Mapped[date] = mapped_column(DATE, nullable=False)
+    follower_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
 
     credentials: Mapped["Credential"] = relationship(back_populates="user")
     likes: Mapped[set["Post"]] = relationship(  # noqa
@@ -37,8 +40,17 @@ class Credential(BaseAbstractModel):
 class RefreshToken(BaseAbstractModel):
     __tablename__ = "sn_refresh_token"
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    key: Mapped[str] = mapped_column(String(255), nullable=False)
+    key_hash: Mapped[str] = mapped_column(
+        String(64), nullable=False, unique=True
+    )
     valid_until: Mapped[float] = mapped_column(Float, nullable=False)
     owner: Mapped[int] = Column(
-        Integer, ForeignKey("sn_user.id", ondelete="CASCADE")
+        Integer, ForeignKey("sn_user.id", ondelete="CASCADE"), unique=True
     )
+
+
+class RevokedToken(BaseAbstractModel):
+    __tablename__ = "sn_revoked_token"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    jti: Mapped[str] = mapped_column(String(32), nullable=False, unique=True)
+    valid_until: Mapped[float] = mapped_column(Float, nullable=False)
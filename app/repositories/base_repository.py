@@ -1,17 +1,44 @@
-from collections.abc import Iterable, Mapping, Sequence
-from typing import Any, ClassVar, TypeVar, Union
+from collections.abc import Callable, Hashable, Iterable, Mapping, Sequence
+from datetime import datetime
+from typing import Any, ClassVar, Optional, TypeVar, Union
 
 from fastapi import Depends
-from sqlalchemy import Select, delete, func, insert, select, update
+from sqlalchemy import (
+    ColumnElement,
+    Executable,
+    Select,
+    Table,
+    bindparam,
+    delete,
+    func,
+    insert,
+    select,
+    text,
+    tuple_,
+    update,
+)
 from sqlalchemy.ext.asyncio import AsyncResult, AsyncSession
 from sqlalchemy.orm.exc import NoResultFound
+from sqlalchemy.schema import CreateTable
 from sqlalchemy.sql import exists as origin_exists
 
-from app.configs.database import get_session
+from app import metrics
+from app.cache import TTLCache
+from app.configs.database import get_read_session, get_session
+from app.configs.environment import get_environment
+from app.repositories.unit_of_work import in_unit_of_work
+from app.schemas.base_schema import CountMode
 
 Model = TypeVar("Model")
 Key = TypeVar("Key", str, int)
 
+settings = get_environment()
+
+count_cache = TTLCache(settings.COUNT_CACHE_SIZE, settings.COUNT_CACHE_TTL)
+metrics.register("count_cache", count_cache.stats)
+
+statements: dict[Hashable, Executable] = {}
+
 
 class BaseSqlAlchemyRepository:
     """
@@ -19,71 +46,298 @@ class BaseSqlAlchemyRepository:
     """
 
     session: AsyncSession
+    read_session: AsyncSession
     model: ClassVar
     base_select: Select
+    staging: ClassVar[Table]
+    projections: ClassVar[Mapping[str, ColumnElement]] = {}
 
-    def __init__(self, session: AsyncSession = Depends(get_session)) -> None:
+    def __init__(
+        self,
+        session: AsyncSession = Depends(get_session),
+        read_session: Optional[AsyncSession] = Depends(get_read_session),
+    ) -> None:
         self.session = session
+        # built outside of a request, read_session is still a Depends
+        self.read_session = (
+            read_session if isinstance(read_session, AsyncSession) else session
+        )
+
+    async def commit(self) -> None:
+        """
+        Commit, unless a unit of work owns the transaction
+        """
+        if not in_unit_of_work(self.session):
+            await self.session.commit()
+
+    def statement(
+        self, name: str, build: Callable[[], Executable], *keys: Hashable
+    ) -> Executable:
+        """
+        Statement template built once per repository class, name and keys,
+        so a call only binds values and reuses the memoized cache key
+        """
+        key = (type(self), name, *keys)
+        query = statements.get(key)
+        if query is None:
+            query = statements[key] = build()
+        return query
 
     async def create(self, data: Mapping) -> Model:
-        query = insert(self.model).values(**data).returning(self.model)
-        result: AsyncResult = await self.session.execute(query)
-        await self.session.commit()
+        query = self.statement(
+            "create", lambda: insert(self.model).returning(self.model)
+        )
+        result: AsyncResult = await self.session.execute(query, dict(data))
+        await self.commit()
+        self.invalidate_count_cache()
         return result.scalar_one()
 
-    async def get(self, id: Key) -> Model:
+    async def get(self, id: Key, primary: bool = False) -> Model:
+        """
+        Entity by id, read from the primary when primary is set
+        """
+        session = self.session if primary else self.read_session
         try:
-            query = self.base_select.where(self.model.id == id)
-            result: AsyncResult = await self.session.execute(query)
+            query = self.statement(
+                "get",
+                lambda: self.base_select.where(
+                    self.model.id == bindparam("id")
+                ),
+            )
+            result: AsyncResult = await session.execute(query, {"id": id})
             return result.scalars().one()
         except NoResultFound:
             raise  # TODO handle
 
+    async def version(self, id: Key) -> Optional[datetime]:
+        """
+        updated_at, or created_at if never updated, of a live entity
+        without loading it. None if there is no such one
+        """
+        query = self.statement(
+            "version",
+            lambda: select(
+                func.coalesce(self.model.updated_at, self.model.created_at)
+            ).where(
+                self.model.id == bindparam("id"),
+                self.model.deleted_at.is_(None),
+            ),
+        )
+        result: AsyncResult = await self.read_session.execute(
+            query, {"id": id}
+        )
+        return result.scalar_one_or_none()
+
     async def update(self, id: Key, data: Mapping[str, Any]) -> Model:
+        keys = tuple(sorted(data))
         try:
-            query = (
-                update(self.model)
-                .filter(self.model.id == id)  # type: ignore
-                .returning(self.model)
-                .values(**data)
+            query = self.statement(
+                "update",
+                lambda: (
+                    update(self.model)
+                    .filter(self.model.id == bindparam("_id"))  # type: ignore
+                    .returning(self.model)
+                    .values({key: bindparam(f"new_{key}") for key in keys})
+                    .execution_options(populate_existing=True)
+                ),
+                *keys,
             )
-            result: AsyncResult = await self.session.execute(query)
-            await self.session.commit()
+            params = {f"new_{key}": value for key, value in data.items()}
+            result: AsyncResult = await self.session.execute(
+                query, {"_id": id, **params}
+            )
+            await self.commit()
+            if "deleted_at" in data:
+                self.invalidate_count_cache()
             return result.scalar_one()
         except NoResultFound:
             raise
 
+    def projected(self, query: Select, fields: Sequence[str]) -> Select:
+        """
+        Narrow query down to the named projection columns
+        """
+        if not fields:
+            return query
+        return query.with_only_columns(
+            *(self.projections[field] for field in fields)
+        )
+
     async def all(
-        self, limit: int, offset: int, *args: Sequence
-    ) -> list[Model]:
-        query = self.base_select  # type: ignore
-        if args:
-            query.filter(*args)
-        query = query.limit(limit).offset(offset)
-        result: AsyncResult = await self.session.execute(query)
-        return result.scalars().all()
+        self,
+        limit: int,
+        offset: int,
+        *args: Sequence,
+        fields: Sequence[str] = (),
+    ) -> list[Any]:
+        """
+        Page of entities, or of plain rows when projection fields are given
+        """
+
+        def build() -> Select:
+            query = self.projected(self.base_select, fields)
+            if args:
+                query = query.filter(*args)
+            return query.limit(bindparam("limit")).offset(bindparam("offset"))
+
+        query = build() if args else self.statement("all", build, *fields)
+        result: AsyncResult = await self.read_session.execute(
+            query, {"limit": limit, "offset": offset}
+        )
+        return result.all() if fields else result.scalars().all()
+
+    async def seek(
+        self,
+        limit: int,
+        after: Optional[Sequence],
+        *args: Sequence,
+        fields: Sequence[str] = (),
+    ) -> list[Any]:
+        """
+        Keyset page ordered by (created_at, id) descending,
+        starting right after the given key
+        """
+
+        def build() -> Select:
+            query = self.projected(self.base_select, fields)
+            query = query.where(*args).order_by(
+                self.model.created_at.desc(), self.model.id.desc()
+            )
+            if after is not None:
+                query = query.where(
+                    tuple_(self.model.created_at, self.model.id)
+                    < tuple_(
+                        bindparam(
+                            "after_created_at",
+                            type_=self.model.created_at.type,
+                        ),
+                        bindparam("after_id", type_=self.model.id.type),
+                    )
+                )
+            return query.limit(bindparam("limit"))
+
+        query = (
+            build()
+            if args
+            else self.statement("seek", build, after is None, *fields)
+        )
+        params: dict[str, Any] = {"limit": limit}
+        if after is not None:
+            params["after_created_at"], params["after_id"] = after
+        result: AsyncResult = await self.read_session.execute(query, params)
+        return result.all() if fields else result.scalars().all()
 
     async def exists(self, *args: Iterable) -> bool:
         query = origin_exists(self.model).where(*args).select()
-        result: AsyncResult = await self.session.execute(query)
+        result: AsyncResult = await self.read_session.execute(query)
         return result.scalar_one()
 
     async def get_or_none(self, *args: Iterable) -> Union[None, Model]:
         query = self.base_select.where(*args)
-        result: AsyncResult = await self.session.execute(query)
+        result: AsyncResult = await self.read_session.execute(query)
         return result.scalar_one_or_none()
 
     async def delete(self, id: Key) -> None:
-        query = delete(self.model).where(self.model.id == id)
-        await self.session.execute(query)
-        await self.session.commit()
+        query = self.statement(
+            "delete",
+            lambda: delete(self.model).where(self.model.id == bindparam("id")),
+        )
+        await self.session.execute(query, {"id": id})
+        await self.commit()
+        self.invalidate_count_cache()
 
     async def count(self, *args) -> int:
-        query = (
-            select(func.count())
-            .select_from(self.model)
-            .where(self.model.deleted_at.is_(None))
-            .where(*args)
-        )
-        result: AsyncResult = await self.session.execute(query)
+        def build() -> Select:
+            return (
+                select(func.count())
+                .select_from(self.model)
+                .where(self.model.deleted_at.is_(None))
+                .where(*args)
+            )
+
+        query = build() if args else self.statement("count", build)
+        result: AsyncResult = await self.read_session.execute(query)
         return result.scalar_one()
+
+    async def count_by(self, mode: CountMode, *args) -> tuple[int, CountMode]:
+        """
+        Count rows with given strategy, returns count and
+        the strategy which actually produced it
+        """
+        if mode is CountMode.estimated:
+            if not args:
+                estimate = await self.estimated_count()
+                if estimate is not None:
+                    return estimate, CountMode.estimated
+            mode = CountMode.cached
+
+        if mode is CountMode.cached:
+            return await self.cached_count(*args), CountMode.cached
+
+        return await self.count(*args), CountMode.exact
+
+    async def cached_count(self, *args) -> int:
+        compiled = (
+            select(func.count()).select_from(self.model).where(*args).compile()
+        )
+        key = (
+            self.table_name,
+            str(compiled),
+            repr(sorted(compiled.params.items())),
+        )
+        count = count_cache.get(key)
+        if count is None:
+            count = await self.count(*args)
+            count_cache.set(key, count)
+        return count
+
+    async def estimated_count(self) -> Optional[int]:
+        """
+        Planner estimate from pg_class.reltuples, counts soft-deleted rows
+        too. None if table was never analyzed
+        """
+        query = text(
+            "SELECT reltuples::bigint FROM pg_class "
+            "WHERE oid = CAST(:table_name AS regclass)"
+        )
+        result: AsyncResult = await self.read_session.execute(
+            query, {"table_name": self.table_name}
+        )
+        estimate = result.scalar_one_or_none()
+        if estimate is None or estimate < 0:
+            return None
+        return estimate
+
+    async def stage(self, records: Sequence[tuple]) -> None:
+        """
+        COPY records into the temporary staging table,
+        which is dropped on commit
+        """
+        await self.session.execute(CreateTable(self.staging))
+        connection = await self.session.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            self.staging.name,
+            records=records,
+            columns=[column.name for column in self.staging.columns],
+        )
+
+    async def sync_id_sequence(self) -> None:
+        """
+        Move id sequence past ids inserted explicitly
+        """
+        query = select(
+            func.setval(
+                func.pg_get_serial_sequence(self.table_name, "id"),
+                func.coalesce(func.max(self.model.id), 0) + 1,
+                False,
+            )
+        )
+        await self.session.execute(query)
+
+    def invalidate_count_cache(self) -> None:
+        count_cache.invalidate_where(lambda key, _: key[0] == self.table_name)
+
+    @property
+    def table_name(self) -> str:
+        return getattr(self.model, "__table__", self.model).name
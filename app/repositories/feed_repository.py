@@ -0,0 +1,95 @@
+from collections.abc import Sequence
+from typing import Optional
+
+from sqlalchemy import delete, select, tuple_, union, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncResult
+
+from app.models.assosiate_models import Follow, Timeline
+from app.models.post_model import Post
+from app.models.user_model import User
+from app.repositories.base_repository import BaseSqlAlchemyRepository
+
+
+class FeedRepository(BaseSqlAlchemyRepository):
+    """
+    Home timelines: posts are pushed into sn_timeline of every follower on
+    create, except for authors with at least fanout_threshold followers,
+    whose posts are pulled at read time. Which way a post went is kept in
+    its fanned_out flag, so it stays reachable when the author later
+    crosses the threshold in either direction
+    """
+
+    model = Post
+    base_select = select(Post).where(Post.deleted_at.is_(None))
+
+    async def fan_out(self, post: Post, fanout_threshold: int) -> None:
+        marked = (
+            update(Post)
+            .where(
+                Post.id == post.id,
+                User.id == Post.owner,
+                User.follower_count < fanout_threshold,
+            )
+            .values(fanned_out=True)
+            .returning(Post.id, Post.owner, Post.created_at)
+            .cte("marked")
+        )
+        followers = select(
+            Follow.c.follower_id, marked.c.id, marked.c.created_at
+        ).join(marked, Follow.c.followee_id == marked.c.owner)
+        await self.session.execute(
+            insert(Timeline)
+            .from_select(["user_id", "post_id", "created_at"], followers)
+            .on_conflict_do_nothing()
+        )
+        await self.commit()
+
+    async def remove_post(self, post_id: int) -> None:
+        await self.session.execute(
+            delete(Timeline).where(Timeline.c.post_id == post_id)
+        )
+        await self.commit()
+
+    async def home_timeline(
+        self,
+        user_id: int,
+        limit: int,
+        after: Optional[Sequence],
+    ) -> list[Post]:
+        pushed = select(
+            Timeline.c.post_id, Timeline.c.created_at.label("created_at")
+        ).where(Timeline.c.user_id == user_id)
+        followees = select(Follow.c.followee_id).where(
+            Follow.c.follower_id == user_id
+        )
+        pulled = select(
+            Post.id.label("post_id"), Post.created_at.label("created_at")
+        ).where(
+            Post.owner.in_(followees),
+            Post.deleted_at.is_(None),
+            Post.fanned_out.is_(False),
+        )
+        if after is not None:
+            pushed = pushed.where(
+                tuple_(Timeline.c.created_at, Timeline.c.post_id)
+                < tuple_(*after)
+            )
+            pulled = pulled.where(
+                tuple_(Post.created_at, Post.id) < tuple_(*after)
+            )
+        pushed = pushed.order_by(
+            Timeline.c.created_at.desc(), Timeline.c.post_id.desc()
+        ).limit(limit)
+        pulled = pulled.order_by(Post.created_at.desc(), Post.id.desc()).limit(
+            limit
+        )
+
+        candidates = union(pushed, pulled).subquery()
+        query = (
+            self.base_select.join(candidates, Post.id == candidates.c.post_id)
+            .order_by(Post.created_at.desc(), Post.id.desc())
+            .limit(limit)
+        )
+        result: AsyncResult = await self.read_session.execute(query)
+        return result.scalars().all()
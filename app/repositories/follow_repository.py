@@ -0,0 +1,86 @@
+from sqlalchemy import delete, literal, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncResult
+
+from app.models.assosiate_models import Follow, Timeline
+from app.models.post_model import Post
+from app.models.user_model import User
+from app.repositories.base_repository import BaseSqlAlchemyRepository
+
+
+class FollowRepository(BaseSqlAlchemyRepository):
+    model = Follow
+
+    async def follow(
+        self, follower_id: int, followee_id: int, backfill: int
+    ) -> bool:
+        """
+        Follow user and copy followee's latest posts into follower's
+        timeline. Returns False if already followed or no such user
+        """
+        followee = select(literal(follower_id), User.id).where(
+            User.id == followee_id, User.deleted_at.is_(None)
+        )
+        inserted = (
+            insert(Follow)
+            .from_select(["follower_id", "followee_id"], followee)
+            .on_conflict_do_nothing()
+            .returning(Follow.c.followee_id)
+            .cte("inserted")
+        )
+        stmt = (
+            update(User)
+            .where(User.id.in_(select(inserted.c.followee_id)))
+            .values(follower_count=User.follower_count + 1)
+            .returning(User.id)
+            .execution_options(synchronize_session=False)
+        )
+        result: AsyncResult = await self.session.execute(stmt)
+        followed = result.scalar_one_or_none() is not None
+
+        if followed and backfill:
+            latest = (
+                select(literal(follower_id), Post.id, Post.created_at)
+                .where(Post.owner == followee_id, Post.deleted_at.is_(None))
+                .order_by(Post.created_at.desc(), Post.id.desc())
+                .limit(backfill)
+            )
+            await self.session.execute(
+                insert(Timeline)
+                .from_select(["user_id", "post_id", "created_at"], latest)
+                .on_conflict_do_nothing()
+            )
+        await self.commit()
+        return followed
+
+    async def unfollow(self, follower_id: int, followee_id: int) -> bool:
+        deleted = (
+            delete(Follow)
+            .where(
+                Follow.c.follower_id == follower_id,
+                Follow.c.followee_id == followee_id,
+            )
+            .returning(Follow.c.followee_id)
+            .cte("deleted")
+        )
+        stmt = (
+            update(User)
+            .where(User.id.in_(select(deleted.c.followee_id)))
+            .values(follower_count=User.follower_count - 1)
+            .returning(User.id)
+            .execution_options(synchronize_session=False)
+        )
+        result: AsyncResult = await self.session.execute(stmt)
+        unfollowed = result.scalar_one_or_none() is not None
+
+        if unfollowed:
+            await self.session.execute(
+                delete(Timeline).where(
+                    Timeline.c.user_id == follower_id,
+                    Timeline.c.post_id.in_(
+                        select(Post.id).where(Post.owner == followee_id)
+                    ),
+                )
+            )
+        await self.commit()
+        return unfollowed
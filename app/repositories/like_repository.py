@@ -1,24 +1,178 @@
-from sqlalchemy import delete, insert
+from collections.abc import Sequence
 
-from app.models.post_model import Like
+from sqlalchemy import (
+    CTE,
+    Integer,
+    bindparam,
+    column,
+    delete,
+    func,
+    literal,
+    select,
+    tuple_,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncResult
+
+from app.models.post_model import Like, Post
 from app.repositories.base_repository import BaseSqlAlchemyRepository
 
 
 class LikeRepository(BaseSqlAlchemyRepository):
     model = Like
 
+    @staticmethod
+    def adjust_like_count(changed: CTE, sign: int):
+        """
+        Update sn_post.like_count by the rows inserted into or
+        deleted from sn_like in the given CTE, within the same statement
+        """
+        deltas = (
+            select(changed.c.post_id, func.count().label("delta"))
+            .group_by(changed.c.post_id)
+            .subquery()
+        )
+        return (
+            update(Post)
+            .where(Post.id == deltas.c.post_id)
+            .values(like_count=Post.like_count + sign * deltas.c.delta)
+            # ORM session sync breaks RETURNING of this CTE based update
+            .execution_options(synchronize_session=False)
+        )
+
     async def like_post(self, post_id: int, user_id: int) -> None:
-        stmt = insert(Like).values(user_id=user_id, post_id=post_id)
-        await self.session.execute(stmt)
-        await self.session.commit()
+        def build():
+            inserted = (
+                insert(Like)
+                .values(
+                    user_id=bindparam("liker_id"),
+                    post_id=bindparam("liked_id"),
+                )
+                .on_conflict_do_nothing()
+                .returning(Like.c.post_id)
+                .cte("inserted")
+            )
+            return self.adjust_like_count(inserted, 1)
+
+        await self.session.execute(
+            self.statement("like_post", build),
+            {"liker_id": user_id, "liked_id": post_id},
+        )
+        await self.commit()
 
     async def dislike_post(
         self,
         post_id: int,
         user_id: int,
     ) -> None:
-        stmt = delete(Like).where(
-            Like.c.user_id == user_id, Like.c.post_id == post_id
+        def build():
+            deleted = (
+                delete(Like)
+                .where(
+                    Like.c.user_id == bindparam("liker_id"),
+                    Like.c.post_id == bindparam("liked_id"),
+                )
+                .returning(Like.c.post_id)
+                .cte("deleted")
+            )
+            return self.adjust_like_count(deleted, -1)
+
+        await self.session.execute(
+            self.statement("dislike_post", build),
+            {"liker_id": user_id, "liked_id": post_id},
+        )
+        await self.commit()
+
+    @staticmethod
+    def likable_posts(post_ids: Sequence[int], user_id: int):
+        return select(Post.id).where(
+            Post.id.in_(post_ids),
+            Post.owner != user_id,
+            Post.deleted_at.is_(None),
         )
-        await self.session.execute(stmt)
-        await self.session.commit()
+
+    async def like_posts(
+        self, post_ids: Sequence[int], user_id: int
+    ) -> list[int]:
+        """
+        Like many posts at once, skipping own, deleted and already
+        liked posts. Returns ids of newly liked posts
+        """
+        likable = self.likable_posts(post_ids, user_id).add_columns(
+            literal(user_id)
+        )
+        inserted = (
+            insert(Like)
+            .from_select(["post_id", "user_id"], likable)
+            .on_conflict_do_nothing()
+            .returning(Like.c.post_id)
+            .cte("inserted")
+        )
+        stmt = self.adjust_like_count(inserted, 1).returning(Post.id)
+        result: AsyncResult = await self.session.execute(stmt)
+        await self.commit()
+        return result.scalars().all()
+
+    async def dislike_posts(
+        self, post_ids: Sequence[int], user_id: int
+    ) -> list[int]:
+        """
+        Remove likes from many posts at once. Returns ids of posts
+        which were actually disliked
+        """
+        deleted = (
+            delete(Like)
+            .where(
+                Like.c.user_id == user_id,
+                Like.c.post_id.in_(self.likable_posts(post_ids, user_id)),
+            )
+            .returning(Like.c.post_id)
+            .cte("deleted")
+        )
+        stmt = self.adjust_like_count(deleted, -1).returning(Post.id)
+        result: AsyncResult = await self.session.execute(stmt)
+        await self.commit()
+        return result.scalars().all()
+
+    async def apply_likes(
+        self,
+        likes: Sequence[tuple[int, int]],
+        dislikes: Sequence[tuple[int, int]],
+    ) -> None:
+        """
+        Write many (post_id, user_id) likes and dislikes of different
+        users in a single transaction
+        """
+        if likes:
+            intents = values(
+                column("post_id", Integer),
+                column("user_id", Integer),
+                name="intents",
+            ).data(likes)
+            likable = (
+                select(intents.c.post_id, intents.c.user_id)
+                .join(Post, Post.id == intents.c.post_id)
+                .where(
+                    Post.owner != intents.c.user_id,
+                    Post.deleted_at.is_(None),
+                )
+            )
+            inserted = (
+                insert(Like)
+                .from_select(["post_id", "user_id"], likable)
+                .on_conflict_do_nothing()
+                .returning(Like.c.post_id)
+                .cte("inserted")
+            )
+            await self.session.execute(self.adjust_like_count(inserted, 1))
+        if dislikes:
+            deleted = (
+                delete(Like)
+                .where(tuple_(Like.c.post_id, Like.c.user_id).in_(dislikes))
+                .returning(Like.c.post_id)
+                .cte("deleted")
+            )
+            await self.session.execute(self.adjust_like_count(deleted, -1))
+        await self.commit()
@@ -1,9 +1,165 @@
-from sqlalchemy import select
+from collections.abc import AsyncIterator, Sequence
+from typing import Any, Optional
 
-from app.models.post_model import Post
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Integer,
+    MetaData,
+    Row,
+    String,
+    Table,
+    Text,
+    exists,
+    func,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncResult
+
+from app.models.post_model import Like, Post
+from app.models.user_model import User
 from app.repositories.base_repository import BaseSqlAlchemyRepository
 
+PREVIEW_LENGTH = 200
+
+post_staging = Table(
+    "sn_post_import",
+    MetaData(),
+    Column("id", Integer),
+    Column("header", String(100)),
+    Column("body", Text),
+    Column("owner", Integer),
+    Column("created_at", DateTime(timezone=True)),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
+
 
 class PostRepository(BaseSqlAlchemyRepository):
     model = Post
     base_select = select(Post).where(Post.deleted_at.is_(None))
+    staging = post_staging
+    projections = {
+        "id": Post.id,
+        "header": Post.header,
+        "body": Post.body,
+        "preview": func.left(Post.body, PREVIEW_LENGTH).label("preview"),
+        "owner": Post.owner,
+        "like_count": Post.like_count,
+        "created_at": Post.created_at,
+        "updated_at": Post.updated_at,
+    }
+    export_columns = (
+        Post.id,
+        Post.header,
+        Post.body,
+        Post.owner,
+        Post.like_count,
+        Post.created_at,
+        Post.updated_at,
+    )
+
+    async def stream_rows(
+        self, chunk_size: int
+    ) -> AsyncIterator[Sequence[Row]]:
+        """
+        Read live posts through a server-side cursor,
+        chunk_size rows at a time
+        """
+        query = (
+            select(*self.export_columns)
+            .where(Post.deleted_at.is_(None))
+            .order_by(Post.id)
+            .execution_options(yield_per=chunk_size)
+        )
+        result = await self.read_session.stream(query)
+        async for rows in result.partitions(chunk_size):
+            yield rows
+
+    async def merge_staged(self) -> int:
+        """
+        Move staged posts of existing users into sn_post,
+        skipping taken ids. Returns number of inserted posts
+        """
+        staged = self.staging.c
+        query = (
+            insert(Post)
+            .from_select(
+                ["id", "header", "body", "owner", "created_at"],
+                select(
+                    staged.id,
+                    staged.header,
+                    staged.body,
+                    staged.owner,
+                    func.coalesce(staged.created_at, func.now()),
+                ).where(exists().where(User.id == staged.owner)),
+            )
+            .on_conflict_do_nothing(index_elements=["id"])
+            .returning(Post.id)
+        )
+        result: AsyncResult = await self.session.execute(query)
+        inserted = len(result.scalars().all())
+        await self.sync_id_sequence()
+        await self.commit()
+        return inserted
+
+    async def search(
+        self, text: str, limit: int, after: Optional[Sequence]
+    ) -> list[Any]:
+        """
+        Full-text search over header and body ranked by ts_rank_cd,
+        keyset paginated by (rank, id). Rows are (Post, rank, snippet)
+        """
+        tsquery = func.websearch_to_tsquery("english", text)
+        rank = func.ts_rank_cd(Post.search_vector, tsquery)
+        snippet = func.ts_headline(
+            "english",
+            Post.body,
+            tsquery,
+            "MaxFragments=2, MaxWords=20, MinWords=5",
+        )
+        query = self.base_select.add_columns(
+            rank.label("rank"), snippet.label("snippet")
+        ).where(Post.search_vector.bool_op("@@")(tsquery))
+        if after is not None:
+            query = query.where(tuple_(rank, Post.id) < tuple_(*after))
+        query = query.order_by(rank.desc(), Post.id.desc()).limit(limit)
+        result: AsyncResult = await self.read_session.execute(query)
+        return result.all()
+
+    async def reconcile_like_counts(
+        self, after_id: int, batch_size: int
+    ) -> tuple[Optional[int], int]:
+        """
+        Recompute like_count for the next batch of posts by id,
+        returns last id of the batch and number of fixed posts
+        """
+        query = (
+            select(Post.id)
+            .where(Post.id > after_id)
+            .order_by(Post.id)
+            .limit(batch_size)
+        )
+        result: AsyncResult = await self.session.execute(query)
+        ids = result.scalars().all()
+        if not ids:
+            return None, 0
+
+        actual = (
+            select(func.count())
+            .select_from(Like)
+            .where(Like.c.post_id == Post.id)
+            .scalar_subquery()
+        )
+        stmt = (
+            update(Post)
+            .where(Post.id.between(ids[0], ids[-1]))
+            .where(Post.like_count != actual)
+            .values(like_count=actual)
+        )
+        result = await self.session.execute(stmt)
+        await self.commit()
+        return ids[-1], result.rowcount
@@ -0,0 +1,66 @@
+from contextlib import asynccontextmanager
+from types import TracebackType
+from typing import AsyncIterator, Optional
+
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncSessionTransaction
+
+from app.configs.database import get_session
+from app.configs.environment import get_environment
+
+DEPTH_KEY = "unit_of_work_depth"
+
+
+def in_unit_of_work(session: AsyncSession) -> bool:
+    return session.info.get(DEPTH_KEY, 0) > 0
+
+
+class UnitOfWork:
+    """
+    Groups repository calls on the request session into one transaction,
+    committed once when the outermost block exits cleanly and rolled back
+    on error. Nested blocks run in savepoints. With REPOSITORY_AUTOCOMMIT
+    every repository call keeps committing on its own
+    """
+
+    session: AsyncSession
+
+    def __init__(self, session: AsyncSession = Depends(get_session)) -> None:
+        self.session = session
+        self.autocommit = get_environment().REPOSITORY_AUTOCOMMIT
+        self._savepoints: list[Optional[AsyncSessionTransaction]] = []
+
+    async def __aenter__(self) -> "UnitOfWork":
+        if self.autocommit:
+            return self
+        depth = self.session.info.get(DEPTH_KEY, 0)
+        savepoint = await self.session.begin_nested() if depth else None
+        self._savepoints.append(savepoint)
+        self.session.info[DEPTH_KEY] = depth + 1
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        if self.autocommit:
+            return
+        self.session.info[DEPTH_KEY] -= 1
+        transaction = self._savepoints.pop() or self.session
+        if exc_type is None:
+            await transaction.commit()
+        else:
+            await transaction.rollback()
+
+    @asynccontextmanager
+    async def savepoint(self) -> AsyncIterator["UnitOfWork"]:
+        """
+        Block whose failure only rolls back its own changes
+        """
+        if self.autocommit:
+            yield self
+            return
+        async with self.session.begin_nested():
+            yield self
@@ -1,16 +1,107 @@
-from datetime import date
-from typing import Optional
+from collections.abc import Mapping, Sequence
+from datetime import date, datetime
+from typing import Any, Optional
 
-from sqlalchemy import or_, select
+from sqlalchemy import (
+    DATE,
+    Column,
+    DateTime,
+    Float,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    bindparam,
+    delete,
+    exists,
+    func,
+    literal,
+    or_,
+    select,
+    tuple_,
+)
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncResult
 
-from app.models.user_model import Credential, RefreshToken, User
+from app.models.user_model import Credential, RefreshToken, RevokedToken, User
 from app.repositories.base_repository import BaseSqlAlchemyRepository
 
+user_staging = Table(
+    "sn_user_import",
+    MetaData(),
+    Column("id", Integer),
+    Column("first_name", String(50)),
+    Column("last_name", String(50)),
+    Column("birth_date", DATE),
+    Column("login", String(50)),
+    Column("password", String(255)),
+    Column("created_at", DateTime(timezone=True)),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
+
 
 class UserRepository(BaseSqlAlchemyRepository):
     model = User
     base_select = select(User).where(User.deleted_at.is_(None))
+    staging = user_staging
+
+    async def merge_staged(self) -> int:
+        """
+        Move staged users with their credentials into real tables,
+        skipping taken ids and logins. Of staged duplicates the row with
+        the lowest login, then id, wins. Returns number of inserted users
+        """
+        staged = self.staging.c
+        # one row per id first, so an id never gets two logins
+        by_id = (
+            select(self.staging)
+            .distinct(staged.id)
+            .order_by(staged.id, staged.login)
+            .cte("by_id")
+        )
+        fresh = (
+            select(by_id)
+            .distinct(by_id.c.login)
+            .where(
+                ~exists().where(User.id == by_id.c.id),
+                ~exists().where(Credential.login == by_id.c.login),
+            )
+            .order_by(by_id.c.login, by_id.c.id)
+            .cte("fresh")
+        )
+        created_at = func.coalesce(fresh.c.created_at, func.now())
+        users = (
+            insert(User)
+            .from_select(
+                ["id", "first_name", "last_name", "birth_date", "created_at"],
+                select(
+                    fresh.c.id,
+                    fresh.c.first_name,
+                    fresh.c.last_name,
+                    fresh.c.birth_date,
+                    created_at,
+                ),
+            )
+            .on_conflict_do_nothing(index_elements=["id"])
+            .returning(User.id)
+            .cte("users")
+        )
+        query = (
+            insert(Credential)
+            .from_select(
+                ["user_id", "login", "password", "created_at"],
+                select(
+                    fresh.c.id, fresh.c.login, fresh.c.password, created_at
+                ).join(users, users.c.id == fresh.c.id),
+            )
+            .returning(Credential.user_id)
+        )
+        result: AsyncResult = await self.session.execute(query)
+        inserted = len(result.scalars().all())
+        await self.sync_id_sequence()
+        await self.commit()
+        return inserted
 
     async def search(
         self,
@@ -18,7 +109,15 @@ class UserRepository(BaseSqlAlchemyRepository):
         last_name: Optional[str],
         substr: Optional[str],
         birth_date: Optional[date],
-    ) -> list[User]:
+        limit: int = 20,
+        after: Optional[Sequence] = None,
+    ) -> list[Any]:
+        """
+        Substring search is served by trigram indexes and ranked by
+        similarity, pages are keyset paginated by (rank, id).
+        Rows are (User, rank)
+        """
+        rank: Any = literal(0.0, Float)
         query = select(self.model).where(self.model.deleted_at.is_(None))
 
         if first_name:
@@ -28,24 +127,48 @@ class UserRepository(BaseSqlAlchemyRepository):
             query = query.where(self.model.last_name == last_name)
 
         if substr:
+            pattern = "%{}%".format(
+                substr.replace("\\", "\\\\")
+                .replace("%", "\\%")
+                .replace("_", "\\_")
+            )
             query = query.where(
                 or_(
-                    User.last_name.icontains(substr),
-                    User.first_name.icontains(substr),
+                    User.last_name.ilike(pattern, escape="\\"),
+                    User.first_name.ilike(pattern, escape="\\"),
                 )
             )
+            rank = func.greatest(
+                func.similarity(User.first_name, substr),
+                func.similarity(User.last_name, substr),
+            )
 
         if birth_date:
             query = query.where(self.model.birth_date == birth_date)
-        result: AsyncResult = await self.session.execute(query)
-        return result.scalars().all()
+
+        if after is not None:
+            query = query.where(tuple_(rank, User.id) < tuple_(*after))
+        query = (
+            query.add_columns(rank.label("rank"))
+            .order_by(rank.desc(), User.id.desc())
+            .limit(limit)
+        )
+        result: AsyncResult = await self.read_session.execute(query)
+        return result.all()
 
     async def get_by_login(self, login: str) -> User:
-        query = select(self.model).where(
-            self.model.deleted_at.is_(None),
-            self.model.credentials.has(Credential.login == login),
+        query = self.statement(
+            "get_by_login",
+            lambda: select(self.model).where(
+                self.model.deleted_at.is_(None),
+                self.model.credentials.has(
+                    Credential.login == bindparam("login")
+                ),
+            ),
+        )
+        result: AsyncResult = await self.read_session.execute(
+            query, {"login": login}
         )
-        result: AsyncResult = await self.session.execute(query)
         return result.scalars().one()
 
 
@@ -57,3 +180,99 @@ class CredentialRepository(BaseSqlAlchemyRepository):
 class RefreshTokenRepository(BaseSqlAlchemyRepository):
     model = RefreshToken
     base_select = select(RefreshToken).where(RefreshToken.deleted_at.is_(None))
+
+    async def upsert(self, data: Mapping[str, Any]) -> None:
+        """
+        Store the only refresh token of data["owner"], replacing
+        the previous one in the same statement
+        """
+        query = self.statement(
+            "upsert",
+            lambda: (
+                insert(RefreshToken)
+                .values(
+                    owner=bindparam("token_owner"),
+                    key_hash=bindparam("token_key_hash"),
+                    valid_until=bindparam("token_valid_until"),
+                )
+                .on_conflict_do_update(
+                    index_elements=[RefreshToken.owner],
+                    set_={
+                        "key_hash": bindparam("token_key_hash"),
+                        "valid_until": bindparam("token_valid_until"),
+                        "updated_at": func.now(),
+                    },
+                )
+            ),
+        )
+        await self.session.execute(
+            query, {f"token_{key}": value for key, value in data.items()}
+        )
+        await self.commit()
+
+    async def get_by_key_hash(self, key_hash: str) -> Optional[RefreshToken]:
+        query = self.statement(
+            "get_by_key_hash",
+            lambda: self.base_select.where(
+                RefreshToken.key_hash == bindparam("key_hash")
+            ),
+        )
+        result: AsyncResult = await self.read_session.execute(
+            query, {"key_hash": key_hash}
+        )
+        return result.scalar_one_or_none()
+
+    async def delete_expired(self, batch_size: int) -> int:
+        """
+        Delete up to batch_size expired tokens, skipping rows locked
+        by concurrent logins. Returns number of deleted rows
+        """
+        expired = (
+            select(RefreshToken.id)
+            .where(
+                RefreshToken.valid_until
+                < datetime.timestamp(datetime.utcnow())
+            )
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        query = (
+            delete(RefreshToken)
+            .where(RefreshToken.id.in_(expired.scalar_subquery()))
+            .returning(RefreshToken.id)
+        )
+        result: AsyncResult = await self.session.execute(query)
+        await self.commit()
+        return len(result.scalars().all())
+
+
+class RevokedTokenRepository(BaseSqlAlchemyRepository):
+    model = RevokedToken
+    base_select = select(RevokedToken).where(RevokedToken.deleted_at.is_(None))
+
+    async def revoke(self, data: Mapping[str, Any]) -> None:
+        """
+        Store revoked token id, revoking the same token again is a no-op
+        """
+        query = self.statement(
+            "revoke",
+            lambda: (
+                insert(RevokedToken)
+                .values(
+                    jti=bindparam("token_jti"),
+                    valid_until=bindparam("token_valid_until"),
+                )
+                .on_conflict_do_nothing(index_elements=[RevokedToken.jti])
+            ),
+        )
+        await self.session.execute(
+            query, {f"token_{key}": value for key, value in data.items()}
+        )
+        await self.commit()
+
+    async def active_ids(self) -> set[str]:
+        query = select(RevokedToken.jti).where(
+            RevokedToken.valid_until > datetime.timestamp(datetime.utcnow())
+        )
+        result: AsyncResult = await self.session.execute(query)
+        return set(result.scalars().all())
@@ -0,0 +1,27 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query, Request
+
+from app.configs.environment import get_environment
+from app.dependencies import check_admin
+from app.schemas.import_schema import ImportKind, ImportReportSchema
+from app.schemas.post_schema import ExportFormat
+from app.services.import_service import ImportService, iter_lines
+
+router = APIRouter(prefix="/admin", dependencies=[Depends(check_admin)])
+
+
+@router.post("/import/{kind}/", response_model=ImportReportSchema)
+async def import_records(
+    request: Request,
+    kind: ImportKind,
+    format: ExportFormat = ExportFormat.ndjson,
+    batch_size: Optional[int] = Query(None, ge=1, le=100000),
+    service: ImportService = Depends(),
+):
+    return await service.import_records(
+        kind,
+        format,
+        iter_lines(request.stream()),
+        batch_size or get_environment().IMPORT_BATCH_SIZE,
+    )
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import ORJSONResponse
 
 from app import messages
+from app.dependencies import check_authenticated
+from app.repositories.unit_of_work import UnitOfWork
 from app.schemas.auth_schema import (
     AuthenticationSchema,
     RegistrationSchema,
@@ -11,22 +13,26 @@ from app.services.auth_services import AuthService
 from app.services.user_service import (
     CredentialService,
     RefreshTokenService,
+    RevokedTokenService,
     UserService,
 )
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
 
-@router.post("/login", response_model=TokensSchema)
+@router.post(
+    "/login", response_model=TokensSchema, response_class=ORJSONResponse
+)
 async def create_tokens(
     data: AuthenticationSchema,
     service: AuthService = Depends(),
     credential_service: CredentialService = Depends(),
     refresh_service: RefreshTokenService = Depends(),
 ):
-    return await service.access_token(
+    tokens = await service.access_token(
         data, credential_service, refresh_service
     )
+    return ORJSONResponse(tokens.dict())
 
 
 @router.post("/register/")
@@ -35,9 +41,10 @@ async def register_user(
     service: AuthService = Depends(),
     credential_service: CredentialService = Depends(),
     user_service: UserService = Depends(),
+    uow: UnitOfWork = Depends(),
 ):
-    await service.register(data, user_service, credential_service)
-    return JSONResponse(
+    await service.register(data, user_service, credential_service, uow)
+    return ORJSONResponse(
         status_code=201, content={"message": messages.SUCCESSFULLY_REGISTERED}
     )
 
@@ -46,10 +53,24 @@ async def register_user(
     "/refresh-token/",
     response_model=TokensSchema,
     response_model_include={"access_token"},
+    response_class=ORJSONResponse,
 )
 async def refresh_token(
     data: TokensSchema,
     service: AuthService = Depends(),
     refresh_service: RefreshTokenService = Depends(),
 ):
-    return await service.generate_new(data, service=refresh_service)
+    tokens = await service.generate_new(data, service=refresh_service)
+    return ORJSONResponse({"access_token": tokens.access_token})
+
+
+@router.post(
+    "/logout/", status_code=204, dependencies=[Depends(check_authenticated)]
+)
+async def logout(
+    request: Request,
+    service: AuthService = Depends(),
+    revoked_service: RevokedTokenService = Depends(),
+):
+    _, token = request.headers["Authorization"].split()
+    await service.revoke(token, service=revoked_service)
@@ -0,0 +1,19 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Request
+
+from app.dependencies import check_authenticated
+from app.schemas.post_schema import PostPaginationSchema
+from app.services.feed_service import FeedService
+
+router = APIRouter(prefix="/feed", dependencies=[Depends(check_authenticated)])
+
+
+@router.get("/", response_model=PostPaginationSchema)
+async def get_feed(
+    request: Request,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    service: FeedService = Depends(),
+):
+    return await service.get_feed(request.user.id, cursor, limit)
@@ -0,0 +1,13 @@
+from fastapi import APIRouter, Depends
+
+from app import metrics
+from app.dependencies import check_admin
+
+router = APIRouter(
+    prefix="/metrics", tags=["Metrics"], dependencies=[Depends(check_admin)]
+)
+
+
+@router.get("/")
+async def get_metrics():
+    return metrics.collect()
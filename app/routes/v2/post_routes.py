@@ -1,12 +1,29 @@
-from fastapi import APIRouter, Depends, Request
+from typing import Optional
 
-from app.dependencies import check_authenticated
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import ORJSONResponse, StreamingResponse
+
+from app.conditional import (
+    entity_validators,
+    is_conditional,
+    is_not_modified,
+    not_modified,
+    validator_headers,
+)
+from app.dependencies import check_admin, check_authenticated
+from app.schemas.base_schema import CountMode, PaginationMode
 from app.schemas.post_schema import (
+    BulkLikeResultSchema,
+    BulkLikeSchema,
+    ExportFormat,
     PostCreateSchema,
     PostPaginationSchema,
     PostSchema,
+    PostSearchPaginationSchema,
     UpdatePostSchema,
 )
+from app.services.export_service import MEDIA_TYPES, ExportService
+from app.services.feed_service import FeedService
 from app.services.post_service import LikeService, PostService
 
 router = APIRouter(
@@ -14,23 +31,116 @@ router = APIRouter(
 )
 
 
-@router.get("/", response_model=PostPaginationSchema)
+@router.get(
+    "/", response_model=PostPaginationSchema, response_class=ORJSONResponse
+)
 async def get_posts(
-    offset: int = 0, limit: int = 20, service: PostService = Depends()
+    request: Request,
+    offset: int = 0,
+    limit: int = 20,
+    mode: PaginationMode = PaginationMode.offset,
+    cursor: Optional[str] = None,
+    count_mode: CountMode = CountMode.exact,
+    fields: Optional[str] = Query(
+        None, description="comma separated, e.g. id,header,preview"
+    ),
+    service: PostService = Depends(),
 ):
-    return await service.get_list(offset, limit)
+    if cursor is not None:
+        mode = PaginationMode.cursor
+    # clients poll the first page, answer them from row timestamps
+    if cursor is None and (mode is PaginationMode.cursor or offset == 0):
+        if is_conditional(request):
+            etag = await service.get_first_page_version(
+                limit, mode, count_mode, fields
+            )
+            if is_not_modified(request, etag):
+                return not_modified(etag)
+        page, etag = await service.get_first_page(
+            limit, mode, count_mode, fields
+        )
+        return ORJSONResponse(page, headers=validator_headers(etag))
+    # rows are validated once by the service, returning a response
+    # skips response_model validation and jsonable_encoder
+    if mode is PaginationMode.cursor:
+        page = await service.get_cursor_list(cursor, limit, fields=fields)
+    else:
+        page = await service.get_list(
+            offset, limit, count_mode=count_mode, fields=fields
+        )
+    return ORJSONResponse(page)
+
+
+@router.get("/search/", response_model=PostSearchPaginationSchema)
+async def search_posts(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    service: PostService = Depends(),
+):
+    return await service.search(q, cursor, limit)
+
+
+@router.get("/export/", dependencies=[Depends(check_admin)])
+async def export_posts(
+    format: ExportFormat = ExportFormat.ndjson,
+    chunk_size: int = Query(1000, ge=1, le=10000),
+    service: ExportService = Depends(),
+):
+    return StreamingResponse(
+        service.export_posts(format, chunk_size),
+        media_type=MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f"attachment; filename=posts.{format.value}"
+        },
+    )
 
 
 @router.post("/", status_code=201)
 async def create_post(
-    request: Request, data: PostCreateSchema, service: PostService = Depends()
+    request: Request,
+    data: PostCreateSchema,
+    service: PostService = Depends(),
+    feed_service: FeedService = Depends(),
 ):
-    return await service.create_post(data, request)
+    return await service.create_post(data, request, feed_service)
 
 
-@router.get("/{id}/", response_model=PostSchema)
-async def get_one(id: int, service: PostService = Depends()):
-    return await service.get_one(id)
+@router.post("/like/", response_model=BulkLikeResultSchema)
+async def like_posts(
+    request: Request,
+    data: BulkLikeSchema,
+    like_service: LikeService = Depends(),
+):
+    liked = await like_service.like_many(data.post_ids, request.user.id)
+    return {"post_ids": liked}
+
+
+@router.post("/dislike/", response_model=BulkLikeResultSchema)
+async def dislike_posts(
+    request: Request,
+    data: BulkLikeSchema,
+    like_service: LikeService = Depends(),
+):
+    disliked = await like_service.dislike_many(data.post_ids, request.user.id)
+    return {"post_ids": disliked}
+
+
+@router.get("/{id}/", response_model=PostSchema, response_class=ORJSONResponse)
+async def get_one(request: Request, id: int, service: PostService = Depends()):
+    post = await service.get_cached(id)
+    if post is None:
+        if is_conditional(request):
+            validators = await service.get_version(id)
+            if validators is not None and is_not_modified(
+                request, *validators
+            ):
+                return not_modified(*validators)
+        post = await service.get_one_cached(id)
+    validators = entity_validators(id, post.modified)
+    if is_not_modified(request, *validators):
+        return not_modified(*validators)
+    return ORJSONResponse(post.data, headers=validator_headers(*validators))
 
 
 @router.put("/{id}/", response_model=PostSchema)
@@ -42,9 +152,12 @@ async def update_post(
 
 @router.delete("/{id}/", status_code=204)
 async def delete_post(
-    request: Request, id: int, service: PostService = Depends()
+    request: Request,
+    id: int,
+    service: PostService = Depends(),
+    feed_service: FeedService = Depends(),
 ):
-    await service.check_and_delete_post(id, request.user.id)
+    await service.check_and_delete_post(id, request.user.id, feed_service)
     return 204
 
 
@@ -0,0 +1,49 @@
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query, Request
+
+from app.dependencies import check_authenticated
+from app.schemas.user_schema import UserSearchPaginationSchema
+from app.services.follow_service import FollowService
+from app.services.user_service import UserService
+
+router = APIRouter(
+    prefix="/users", dependencies=[Depends(check_authenticated)]
+)
+
+
+@router.get("/search/", response_model=UserSearchPaginationSchema)
+async def search_users(
+    q: Optional[str] = Query(None, min_length=1, max_length=50),
+    first_name: Optional[str] = None,
+    last_name: Optional[str] = None,
+    birth_date: Optional[date] = None,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    service: UserService = Depends(),
+):
+    return await service.search_user(
+        first_name=first_name,
+        last_name=last_name,
+        substr=q,
+        birth_date=birth_date,
+        limit=limit,
+        cursor=cursor,
+    )
+
+
+@router.post("/{user_id}/follow/", status_code=200)
+async def follow_user(
+    request: Request, user_id: int, service: FollowService = Depends()
+):
+    await service.follow(request.user.id, user_id)
+    return 200
+
+
+@router.delete("/{user_id}/unfollow/", status_code=204)
+async def unfollow_user(
+    request: Request, user_id: int, service: FollowService = Depends()
+):
+    await service.unfollow(request.user.id, user_id)
+    return 200
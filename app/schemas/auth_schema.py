@@ -24,6 +24,11 @@ class CredentialSchema(AuthenticationSchema):
 
 
 class RefreshTokenSchema(BaseModel):
-    key: str
+    key_hash: str
     valid_until: float
     owner: int
+
+
+class RevokedTokenSchema(BaseModel):
+    jti: str
+    valid_until: float
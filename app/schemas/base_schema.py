@@ -1,6 +1,20 @@
+from enum import Enum
+from typing import Optional
+
 from pydantic import BaseModel
 
 
+class PaginationMode(str, Enum):
+    offset = "offset"
+    cursor = "cursor"
+
+
+class CountMode(str, Enum):
+    exact = "exact"
+    cached = "cached"
+    estimated = "estimated"
+
+
 class BaseSchema(BaseModel):
     id: int
 
@@ -13,3 +27,4 @@ class PaginationSchema(BaseModel):
     limit: int
     offset: int
     count: int
+    count_mode: Optional[CountMode]
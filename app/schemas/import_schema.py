@@ -0,0 +1,49 @@
+from datetime import date, datetime
+from enum import Enum
+from typing import Optional
+
+from pydantic import BaseModel, conint, constr
+
+BCRYPT_HASH = r"^\$2[aby]?\$\d{2}\$[./A-Za-z0-9]{53}$"
+
+
+class ImportKind(str, Enum):
+    users = "users"
+    posts = "posts"
+
+
+class UserImportSchema(BaseModel):
+    id: conint(gt=0)  # type: ignore
+    first_name: constr(min_length=1, max_length=50)  # type: ignore
+    last_name: constr(min_length=1, max_length=50)  # type: ignore
+    birth_date: date
+    login: constr(min_length=1, max_length=50)  # type: ignore
+    password: constr(regex=BCRYPT_HASH)  # type: ignore
+    created_at: Optional[datetime]
+
+
+class PostImportSchema(BaseModel):
+    id: conint(gt=0)  # type: ignore
+    header: constr(min_length=1, max_length=100)  # type: ignore
+    body: str
+    owner: conint(gt=0)  # type: ignore
+    created_at: Optional[datetime]
+
+
+class ImportBatchSchema(BaseModel):
+    batch: int
+    received: int
+    rejected: int
+    inserted: int
+    validate_ms: float
+    copy_ms: float
+    merge_ms: float
+    error: Optional[str]
+
+
+class ImportReportSchema(BaseModel):
+    kind: ImportKind
+    received: int
+    rejected: int
+    inserted: int
+    batches: list[ImportBatchSchema]
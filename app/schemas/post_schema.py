@@ -1,4 +1,8 @@
-from typing import Optional
+from datetime import datetime
+from enum import Enum
+from typing import Optional, Union
+
+from pydantic import BaseModel, conlist
 
 from app.schemas.base_schema import BaseSchema, PaginationSchema
 
@@ -11,6 +15,7 @@ class PostCreateSchema(BaseSchema):
 
 class PostSchema(PostCreateSchema):
     id: int
+    like_count: int = 0
 
 
 class UpdatePostSchema(PostCreateSchema):
@@ -18,5 +23,43 @@ class UpdatePostSchema(PostCreateSchema):
     body: Optional[str]
 
 
+class PostFieldsSchema(BaseModel):
+    id: Optional[int]
+    header: Optional[str]
+    body: Optional[str]
+    preview: Optional[str]
+    owner: Optional[int]
+    like_count: Optional[int]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+
 class PostPaginationSchema(PaginationSchema):
-    data: list[PostSchema]
+    data: list[Union[PostSchema, PostFieldsSchema]]
+    offset: Optional[int]
+    count: Optional[int]
+    next_cursor: Optional[str]
+
+
+class BulkLikeSchema(BaseModel):
+    post_ids: conlist(int, min_items=1, max_items=500)  # type: ignore
+
+
+class BulkLikeResultSchema(BaseModel):
+    post_ids: list[int]
+
+
+class PostSearchSchema(PostSchema):
+    rank: float
+    snippet: str
+
+
+class PostSearchPaginationSchema(BaseModel):
+    data: list[PostSearchSchema]
+    limit: int
+    next_cursor: Optional[str]
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
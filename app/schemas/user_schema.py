@@ -0,0 +1,22 @@
+from datetime import date
+from typing import Optional
+
+from pydantic import BaseModel
+
+from app.schemas.base_schema import BaseSchema
+
+
+class UserSchema(BaseSchema):
+    first_name: str
+    last_name: str
+    birth_date: date
+
+
+class UserSearchSchema(UserSchema):
+    rank: float
+
+
+class UserSearchPaginationSchema(BaseModel):
+    data: list[UserSearchSchema]
+    limit: int
+    next_cursor: Optional[str]
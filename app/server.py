@@ -1,3 +1,5 @@
+import asyncio
+
 from fastapi import Depends, FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
@@ -5,23 +7,70 @@ from fastapi.security import HTTPBearer
 from starlette.authentication import AuthenticationError
 from starlette.middleware.authentication import AuthenticationMiddleware
 
+from app.configs.environment import get_environment
+from app.exceptions import ServiceOverloadedError
 from app.middlewares.authentication import JWTAuthentication
+from app.middlewares.session import SessionMiddleware
+from app.routes.v2.admin_routes import router as admin_router
 from app.routes.v2.authentication import router
+from app.routes.v2.feed_routes import router as feed_router
+from app.routes.v2.metrics_routes import router as metrics_router
 from app.routes.v2.post_routes import router as post_router
+from app.routes.v2.user_routes import router as user_router
+from app.services.auth_services import PasswordHandler
+from app.services.like_buffer import like_buffer
+from app.services.post_cache import post_cache
+from app.services.revocation_service import denylist
+from app.services.token_sweeper import refresh_token_sweeper
 
 reuseable_oauth = HTTPBearer(bearerFormat="JWT")
+settings = get_environment()
 
 
 def get_application() -> FastAPI:
 
     app = FastAPI()
     app.include_router(post_router, dependencies=[Depends(reuseable_oauth)])
+    app.include_router(user_router, dependencies=[Depends(reuseable_oauth)])
+    app.include_router(feed_router, dependencies=[Depends(reuseable_oauth)])
+    app.include_router(admin_router, dependencies=[Depends(reuseable_oauth)])
     app.include_router(router, prefix="/api/v2")
+    app.include_router(metrics_router, prefix="/api/v2")
 
     @app.get("/", dependencies=[Depends(reuseable_oauth)])
     async def starter(request: Request):
         return {"msg": request.user}
 
+    @app.on_event("startup")
+    async def start_background_tasks():
+        app.state.tasks = []
+        if settings.STATELESS_AUTH:
+            app.state.tasks.append(
+                asyncio.create_task(
+                    denylist.run(settings.DENYLIST_REFRESH_INTERVAL)
+                )
+            )
+        if settings.LIKE_WRITE_BEHIND:
+            app.state.tasks.append(asyncio.create_task(like_buffer.run()))
+        if post_cache.backend is not None:
+            app.state.tasks.append(asyncio.create_task(post_cache.run()))
+        app.state.tasks.append(
+            asyncio.create_task(
+                refresh_token_sweeper.run(
+                    settings.REFRESH_TOKEN_SWEEP_INTERVAL
+                )
+            )
+        )
+
+    @app.on_event("shutdown")
+    async def stop_background_tasks():
+        for task in app.state.tasks:
+            task.cancel()
+        await asyncio.gather(*app.state.tasks, return_exceptions=True)
+        await like_buffer.flush()
+        await post_cache.close()
+        PasswordHandler.executor.shutdown()
+
     return app
 
 
@@ -34,6 +83,7 @@ app.add_middleware(
     allow_headers=["*"],
 )
 app.add_middleware(AuthenticationMiddleware, backend=JWTAuthentication())
+app.add_middleware(SessionMiddleware)
 
 
 @app.exception_handler(AuthenticationError)
@@ -43,6 +93,15 @@ async def authentication_handler(request: Request, exc: AuthenticationError):
     )
 
 
+@app.exception_handler(ServiceOverloadedError)
+async def overloaded_handler(request: Request, exc: ServiceOverloadedError):
+    return JSONResponse(
+        content={"message": str(exc)},
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
 @app.exception_handler(Exception)
 async def handle(request: Request, exc: Exception):
     return JSONResponse(content=1, status_code=status.HTTP_418_IM_A_TEAPOT)
@@ -1,31 +1,44 @@
+import hashlib
 from datetime import datetime, timedelta
 from typing import Any, Dict
+from uuid import uuid4
 
 from fastapi import Depends, HTTPException, status
 from jose import jwt
 from passlib.context import CryptContext
 from starlette.authentication import AuthenticationError
 
-from app import messages
+from app import messages, metrics
+from app.admission import AdmissionGate
 from app.configs.environment import get_environment
 from app.exceptions import InvalidTokenError
-from app.models.user_model import Credential, RefreshToken
+from app.executors import OffloadExecutor
+from app.models.user_model import Credential
+from app.repositories.unit_of_work import UnitOfWork
 from app.schemas.auth_schema import (
     AuthenticationSchema,
     CredentialSchema,
     RefreshTokenSchema,
     RegistrationSchema,
+    RevokedTokenSchema,
     TokensSchema,
 )
+from app.services.revocation_service import denylist
 from app.services.user_service import (
     CredentialService,
     RefreshTokenService,
+    RevokedTokenService,
     UserService,
 )
 
+settings = get_environment()
+
 
 class PasswordHandler:
     context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    executor = OffloadExecutor(
+        settings.PASSWORD_EXECUTOR, settings.PASSWORD_WORKERS
+    )
 
     @classmethod
     def verify_password(cls, plain_pass: str, hash_pass: str) -> bool:
@@ -35,6 +48,35 @@ class PasswordHandler:
     def get_hash(cls, password: str) -> str:
         return cls.context.hash(password)
 
+    @classmethod
+    async def verify_password_async(
+        cls, plain_pass: str, hash_pass: str
+    ) -> bool:
+        return await cls.executor.run(
+            cls.verify_password, plain_pass, hash_pass
+        )
+
+    @classmethod
+    async def get_hash_async(cls, password: str) -> str:
+        return await cls.executor.run(cls.get_hash, password)
+
+
+password_gate = AdmissionGate(
+    settings.AUTH_MAX_CONCURRENCY,
+    settings.AUTH_MAX_QUEUE,
+    settings.AUTH_RETRY_AFTER,
+)
+
+metrics.register("password_executor", PasswordHandler.executor.stats)
+metrics.register("auth_admission", password_gate.stats)
+
+
+def hash_key(key: str) -> str:
+    """
+    Refresh token keys are stored only as sha256 hex digests
+    """
+    return hashlib.sha256(key.encode()).hexdigest()
+
 
 class AuthenticationHandler:
     handler = PasswordHandler
@@ -52,9 +94,11 @@ class AuthenticationHandler:
         if user_credential is None:
             raise AuthenticationError("Invalid credentials.")
 
-        if not self.handler.verify_password(
-            password, user_credential.password
-        ):
+        async with password_gate:
+            is_valid = await self.handler.verify_password_async(
+                password, user_credential.password
+            )
+        if not is_valid:
             raise AuthenticationError("Invalid credentials.")
         return user_credential
 
@@ -62,7 +106,8 @@ class AuthenticationHandler:
         self, token_type: str = "access", data: Dict[str, Any] = dict()
     ) -> tuple[str, float]:
         """
-        Generate jwt token
+        Generate jwt token. In stateless mode access tokens also carry
+        a token id, so they can be revoked without the database
         """
         token_lifetime = {
             "access": self.settings.ACCESS_TOKEN_LIFETIME,
@@ -70,7 +115,9 @@ class AuthenticationHandler:
         }
         expires_delta = timedelta(minutes=token_lifetime.get(token_type))
         expires_at = datetime.timestamp(datetime.utcnow() + expires_delta)
-        data.update({"expiration_date": expires_at})
+        data = {**data, "expiration_date": expires_at}
+        if token_type == "access" and self.settings.STATELESS_AUTH:
+            data.update({"jti": uuid4().hex})
         encoded = jwt.encode(
             data, self.settings.SECRET_KEY, self.settings.HASH_ALGORITHM
         )
@@ -91,7 +138,9 @@ class AuthenticationHandler:
             options={"verify_exp": False},
         )
         _, key, _ = refresh_token.split(".")
-        instance = await service.get_or_none(RefreshToken.key == key)
+        instance = await service.get_by_key_hash(hash_key(key))
+        if instance is None:
+            raise InvalidTokenError(messages.INVALID_TOKEN)
         if datetime.utcnow() > datetime.fromtimestamp(instance.valid_until):
             raise InvalidTokenError(messages.EXPIRED_TOKEN)
 
@@ -99,7 +148,9 @@ class AuthenticationHandler:
             datetime.utcnow()
             + timedelta(minutes=self.settings.ACCESS_TOKEN_LIFETIME)
         )
-        payload.update(exp=expires_at)
+        payload.update(exp=expires_at, expiration_date=expires_at)
+        if self.settings.STATELESS_AUTH:
+            payload.update(jti=uuid4().hex)
         encoded = jwt.encode(
             payload,
             self.settings.SECRET_KEY,
@@ -107,6 +158,30 @@ class AuthenticationHandler:
         )
         return encoded, expires_at
 
+    async def revoke_token(
+        self, access_token: str, service: RevokedTokenService
+    ) -> None:
+        """
+        Put access token id on the denylist
+        """
+        payload = jwt.decode(
+            access_token,
+            self.settings.SECRET_KEY,
+            algorithms=self.settings.HASH_ALGORITHM,
+        )
+        jti = payload.get("jti")
+        if jti is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=messages.INVALID_TOKEN,
+            )
+        await service.revoke(
+            RevokedTokenSchema(
+                jti=jti, valid_until=payload.get("expiration_date")
+            )
+        )
+        denylist.add(jti)
+
 
 class AuthService:
     handler: AuthenticationHandler
@@ -124,23 +199,23 @@ class AuthService:
             **data.dict(), service=credential_service
         )
         access_token, _ = await self.handler.generate_token(
-            data={"user": user_credential.login}
+            data={
+                "user": user_credential.login,
+                "uid": user_credential.user_id,
+            }
         )
         refresh_token, exp_at = await self.handler.generate_token(
             token_type="refresh", data={"user": user_credential.id}
         )
         _, key, _ = refresh_token.split(".")
 
-        refresh = await refresh_service.get_or_none(  # type: ignore
-            RefreshToken.owner == user_credential.id
-        )
-        if refresh is not None:
-            await refresh_service.delete(refresh.id)  # type: ignore
-        await refresh_service.create(
+        await refresh_service.upsert(
             RefreshTokenSchema(
-                key=key, owner=user_credential.user_id, valid_until=exp_at
+                key_hash=hash_key(key),
+                owner=user_credential.user_id,
+                valid_until=exp_at,
             )
-        )  # type: ignore
+        )
         return TokensSchema(
             access_token=access_token, refresh_token=refresh_token
         )
@@ -150,6 +225,7 @@ class AuthService:
         data: RegistrationSchema,
         user_service: UserService,
         credential_service: CredentialService,
+        uow: UnitOfWork,
     ) -> None:
         try:
             await user_service.get_by_login(data.login)
@@ -161,13 +237,17 @@ class AuthService:
                 detail=messages.ALREADY_REGISTERED,
             )
 
-        password_hash = self.handler.handler.get_hash(data.password)
-        user = await user_service.create(data)
-        await credential_service.create(
-            CredentialSchema(
-                login=data.login, password=password_hash, user_id=user.id
+        async with password_gate:
+            password_hash = await self.handler.handler.get_hash_async(
+                data.password
             )
-        )  # type: ignore
+        async with uow:
+            user = await user_service.create(data)
+            await credential_service.create(
+                CredentialSchema(
+                    login=data.login, password=password_hash, user_id=user.id
+                )
+            )  # type: ignore
 
     async def generate_new(
         self, data: TokensSchema, service: RefreshTokenService
@@ -176,3 +256,6 @@ class AuthService:
             **data.dict(), service=service
         )
         return TokensSchema(access_token=access_token, refresh_token="")
+
+    async def revoke(self, access_token: str, service: RevokedTokenService):
+        await self.handler.revoke_token(access_token, service=service)
@@ -0,0 +1,48 @@
+import csv
+import io
+from collections.abc import AsyncIterator, Sequence
+
+import orjson
+from fastapi import Depends
+from sqlalchemy import Row
+
+from app.repositories.post_repository import PostRepository
+from app.schemas.post_schema import ExportFormat
+
+MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv",
+}
+
+
+def encode_ndjson(rows: Sequence[Row]) -> bytes:
+    # same ISO 8601 datetimes as the orjson API responses
+    return b"".join(orjson.dumps(row._asdict()) + b"\n" for row in rows)
+
+
+def encode_csv(rows: Sequence[Row]) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode()
+
+
+class ExportService:
+    repository: PostRepository
+
+    def __init__(self, repository: PostRepository = Depends()) -> None:
+        self.repository = repository
+
+    async def export_posts(
+        self, format: ExportFormat, chunk_size: int
+    ) -> AsyncIterator[bytes]:
+        """
+        Yield encoded chunks, memory is bound by chunk_size
+        whatever the table size
+        """
+        if format is ExportFormat.csv:
+            yield encode_csv(
+                [[column.key for column in self.repository.export_columns]]
+            )
+        encode = encode_csv if format is ExportFormat.csv else encode_ndjson
+        async for rows in self.repository.stream_rows(chunk_size):
+            yield encode(rows)
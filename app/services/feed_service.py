@@ -0,0 +1,33 @@
+from typing import Dict, Optional
+
+from fastapi import Depends
+
+from app.configs.environment import get_environment
+from app.mixins import keyset_page, parse_keyset_cursor
+from app.models.post_model import Post
+from app.repositories.feed_repository import FeedRepository
+
+settings = get_environment()
+
+
+class FeedService:
+    repository: FeedRepository
+
+    def __init__(self, repository: FeedRepository = Depends()) -> None:
+        self.repository = repository
+
+    async def fan_out(self, post: Post) -> None:
+        await self.repository.fan_out(post, settings.FEED_FANOUT_THRESHOLD)
+
+    async def remove_post(self, post_id: int) -> None:
+        await self.repository.remove_post(post_id)
+
+    async def get_feed(
+        self, user_id: int, cursor: Optional[str], limit: int
+    ) -> Dict:
+        data = await self.repository.home_timeline(
+            user_id,
+            limit + 1,
+            parse_keyset_cursor(cursor),
+        )
+        return keyset_page(data, limit)
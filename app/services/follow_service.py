@@ -0,0 +1,27 @@
+from fastapi import Depends, HTTPException, status
+
+from app import messages
+from app.configs.environment import get_environment
+from app.repositories.follow_repository import FollowRepository
+
+settings = get_environment()
+
+
+class FollowService:
+    repository: FollowRepository
+
+    def __init__(self, repository: FollowRepository = Depends()) -> None:
+        self.repository = repository
+
+    async def follow(self, follower_id: int, followee_id: int) -> bool:
+        if follower_id == followee_id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=messages.ACTION_NOT_ALLOWED,
+            )
+        return await self.repository.follow(
+            follower_id, followee_id, backfill=settings.FEED_BACKFILL_SIZE
+        )
+
+    async def unfollow(self, follower_id: int, followee_id: int) -> bool:
+        return await self.repository.unfollow(follower_id, followee_id)
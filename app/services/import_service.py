@@ -0,0 +1,186 @@
+import codecs
+import csv
+import json
+import time
+from collections.abc import AsyncIterator, Iterator
+from typing import Any, Optional
+
+from asyncpg import PostgresError
+from fastapi import Depends
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.exc import DBAPIError
+
+from app.repositories.base_repository import BaseSqlAlchemyRepository
+from app.repositories.post_repository import PostRepository
+from app.repositories.user_repository import UserRepository
+from app.schemas.import_schema import (
+    ImportKind,
+    PostImportSchema,
+    UserImportSchema,
+)
+from app.schemas.post_schema import ExportFormat
+
+SCHEMAS: dict[ImportKind, type[BaseModel]] = {
+    ImportKind.users: UserImportSchema,
+    ImportKind.posts: PostImportSchema,
+}
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Split a stream of utf-8 bytes into lines, keeping line endings
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        lines = pending.splitlines(keepends=True)
+        pending = lines.pop() if lines and not lines[-1].endswith("\n") else ""
+        for line in lines:
+            yield line
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+def parse_csv_record(text: str) -> list[str]:
+    return next(csv.reader([text]), [])
+
+
+async def iter_records(
+    format: ExportFormat, lines: AsyncIterator[str]
+) -> AsyncIterator[Optional[dict[str, Any]]]:
+    """
+    Parse NDJSON or CSV with a header line into dicts,
+    None stands for an unparsable record
+    """
+    if format is ExportFormat.ndjson:
+        async for line in lines:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            yield record if isinstance(record, dict) else None
+        return
+
+    header: Optional[list[str]] = None
+    pending = ""
+    async for line in lines:
+        pending += line
+        # quoted fields may span lines, a record is complete
+        # once its quotes are balanced
+        if pending.count('"') % 2:
+            continue
+        fields, pending = parse_csv_record(pending), ""
+        if not fields:
+            continue
+        if header is None:
+            header = fields
+            continue
+        if len(fields) != len(header):
+            yield None
+            continue
+        yield {key: value or None for key, value in zip(header, fields)}
+    if pending:
+        yield None
+
+
+def validate_batch(
+    schema: type[BaseModel],
+    columns: list[str],
+    records: list[Optional[dict[str, Any]]],
+) -> Iterator[tuple]:
+    for record in records:
+        if record is None:
+            continue
+        try:
+            item = schema.parse_obj(record)
+        except ValidationError:
+            continue
+        yield tuple(getattr(item, column) for column in columns)
+
+
+def elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 2)
+
+
+class ImportService:
+    repositories: dict[ImportKind, BaseSqlAlchemyRepository]
+
+    def __init__(
+        self,
+        user_repository: UserRepository = Depends(),
+        post_repository: PostRepository = Depends(),
+    ) -> None:
+        self.repositories = {
+            ImportKind.users: user_repository,
+            ImportKind.posts: post_repository,
+        }
+
+    async def import_records(
+        self,
+        kind: ImportKind,
+        format: ExportFormat,
+        lines: AsyncIterator[str],
+        batch_size: int,
+    ) -> dict:
+        """
+        Validate records in batches, COPY each batch into a staging
+        table and merge it into the real tables in one transaction
+        """
+        report: dict[str, Any] = {
+            "kind": kind,
+            "received": 0,
+            "rejected": 0,
+            "inserted": 0,
+            "batches": [],
+        }
+        batch: list[Optional[dict[str, Any]]] = []
+        async for record in iter_records(format, lines):
+            batch.append(record)
+            if len(batch) >= batch_size:
+                await self.import_batch(kind, batch, report)
+                batch = []
+        if batch:
+            await self.import_batch(kind, batch, report)
+        self.repositories[kind].invalidate_count_cache()
+        return report
+
+    async def import_batch(
+        self,
+        kind: ImportKind,
+        records: list[Optional[dict[str, Any]]],
+        report: dict[str, Any],
+    ) -> None:
+        repository = self.repositories[kind]
+        columns = [column.name for column in repository.staging.columns]
+        started = time.perf_counter()
+        rows = list(validate_batch(SCHEMAS[kind], columns, records))
+        result: dict[str, Any] = {
+            "batch": len(report["batches"]) + 1,
+            "received": len(records),
+            "rejected": len(records) - len(rows),
+            "inserted": 0,
+            "validate_ms": elapsed_ms(started),
+            "copy_ms": 0.0,
+            "merge_ms": 0.0,
+            "error": None,
+        }
+        try:
+            if rows:
+                started = time.perf_counter()
+                await repository.stage(rows)
+                result["copy_ms"] = elapsed_ms(started)
+                started = time.perf_counter()
+                result["inserted"] = await repository.merge_staged()
+                result["merge_ms"] = elapsed_ms(started)
+        except (DBAPIError, PostgresError) as e:
+            await repository.session.rollback()
+            result["error"] = str(e)
+            result["rejected"] = len(records)
+        report["received"] += result["received"]
+        report["rejected"] += result["rejected"]
+        report["inserted"] += result["inserted"]
+        report["batches"].append(result)
@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import math
+import time
+from typing import Optional
+
+from app import messages, metrics
+from app.configs.database import SessionFactory
+from app.configs.environment import get_environment
+from app.exceptions import ServiceOverloadedError
+from app.repositories.like_repository import LikeRepository
+from app.services.post_cache import post_cache
+
+log = logging.getLogger(__name__)
+
+settings = get_environment()
+
+
+class LikeBuffer:
+    """
+    Write-behind buffer of like/dislike intents. Only the last intent per
+    (user, post) pair is kept, and pending intents are written to sn_like
+    in one transaction once the buffer is full or the interval passes.
+    While writes fail pending intents are capped at max_pending, new ones
+    are rejected and requeued ones shed beyond it
+    """
+
+    def __init__(
+        self, max_size: int, interval: float, max_pending: int
+    ) -> None:
+        self.max_size = max_size
+        self.interval = interval
+        self.max_pending = max_pending
+        self.pending: dict[tuple[int, int], bool] = {}
+        self.received = 0
+        self.rejected = 0
+        self.shed = 0
+        self.flushed = 0
+        self.flushes = 0
+        self.last_flush_ms = 0.0
+        self.total_flush_ms = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+        self._full: Optional[asyncio.Event] = None
+
+    @property
+    def lock(self) -> asyncio.Lock:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    @property
+    def full(self) -> asyncio.Event:
+        if self._full is None:
+            self._full = asyncio.Event()
+        return self._full
+
+    def add(self, post_id: int, user_id: int, liked: bool) -> None:
+        key = (post_id, user_id)
+        if key not in self.pending and len(self.pending) >= self.max_pending:
+            self.rejected += 1
+            raise ServiceOverloadedError(
+                messages.SERVICE_OVERLOADED, math.ceil(self.interval)
+            )
+        self.pending[key] = liked
+        self.received += 1
+        if len(self.pending) >= self.max_size:
+            self.full.set()
+
+    async def write(
+        self, likes: list[tuple[int, int]], dislikes: list[tuple[int, int]]
+    ) -> None:
+        session = SessionFactory()
+        try:
+            await LikeRepository(session).apply_likes(likes, dislikes)
+        finally:
+            await session.close()
+
+    async def flush(self) -> None:
+        async with self.lock:
+            if not self.pending:
+                return
+            batch, self.pending = self.pending, {}
+            started = time.perf_counter()
+            try:
+                await self.write(
+                    [pair for pair, liked in batch.items() if liked],
+                    [pair for pair, liked in batch.items() if not liked],
+                )
+            except BaseException:
+                self.requeue(batch)
+                raise
+            await post_cache.invalidate(*{post_id for post_id, _ in batch})
+            self.last_flush_ms = (time.perf_counter() - started) * 1000
+            self.total_flush_ms += self.last_flush_ms
+            self.flushes += 1
+            self.flushed += len(batch)
+
+    def requeue(self, batch: dict[tuple[int, int], bool]) -> None:
+        """
+        Put failed intents back, newer ones for the same pair win
+        """
+        shed = 0
+        for pair, liked in batch.items():
+            if pair in self.pending:
+                continue
+            if len(self.pending) >= self.max_pending:
+                shed += 1
+                continue
+            self.pending[pair] = liked
+        if shed:
+            self.shed += shed
+            log.warning(f"ERROR: like buffer full, shed {shed} intents")
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self.full.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self.full.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                log.warning(f"ERROR: like buffer flush failed: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "depth": len(self.pending),
+            "received": self.received,
+            "rejected": self.rejected,
+            "shed": self.shed,
+            "flushed": self.flushed,
+            "coalescing_ratio": (
+                self.received / self.flushed if self.flushed else None
+            ),
+            "flushes": self.flushes,
+            "last_flush_ms": self.last_flush_ms,
+            "avg_flush_ms": (
+                self.total_flush_ms / self.flushes if self.flushes else None
+            ),
+        }
+
+
+like_buffer = LikeBuffer(
+    settings.LIKE_BUFFER_MAX_SIZE,
+    settings.LIKE_BUFFER_FLUSH_INTERVAL,
+    settings.LIKE_BUFFER_MAX_PENDING,
+)
+metrics.register("like_buffer", like_buffer.stats)
@@ -1,6 +1,13 @@
+from collections.abc import Sequence
+
 from fastapi import Depends
 
+from app.configs.environment import get_environment
 from app.repositories.like_repository import LikeRepository
+from app.services.like_buffer import like_buffer
+from app.services.post_cache import post_cache
+
+settings = get_environment()
 
 
 class LikeService:
@@ -10,7 +17,29 @@ class LikeService:
         self.repository = repository
 
     async def like(self, post_id: int, user_id: int) -> None:
-        return await self.repository.like_post(post_id, user_id)
+        if settings.LIKE_WRITE_BEHIND:
+            like_buffer.add(post_id, user_id, liked=True)
+            return None
+        await self.repository.like_post(post_id, user_id)
+        await post_cache.invalidate(post_id)
 
     async def dislike(self, post_id: int, user_id: int) -> None:
-        return await self.repository.dislike_post(post_id, user_id)
+        if settings.LIKE_WRITE_BEHIND:
+            like_buffer.add(post_id, user_id, liked=False)
+            return None
+        await self.repository.dislike_post(post_id, user_id)
+        await post_cache.invalidate(post_id)
+
+    async def like_many(
+        self, post_ids: Sequence[int], user_id: int
+    ) -> list[int]:
+        liked = await self.repository.like_posts(post_ids, user_id)
+        await post_cache.invalidate(*liked)
+        return liked
+
+    async def dislike_many(
+        self, post_ids: Sequence[int], user_id: int
+    ) -> list[int]:
+        disliked = await self.repository.dislike_posts(post_ids, user_id)
+        await post_cache.invalidate(*disliked)
+        return disliked
@@ -0,0 +1,200 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Optional
+
+import orjson
+
+from app import metrics
+from app.cache import CacheBackend, TTLCache, create_cache_backend
+from app.configs.environment import get_environment
+from app.models.post_model import Post
+from app.schemas.post_schema import PostSchema
+
+log = logging.getLogger(__name__)
+
+settings = get_environment()
+
+
+@dataclass(frozen=True)
+class CachedPost:
+    """
+    Serialized PostSchema payload with the version it was read at
+    """
+
+    data: dict[str, Any]
+    modified: datetime
+
+    @classmethod
+    def from_post(cls, post: Post) -> "CachedPost":
+        return cls(
+            data=PostSchema.from_orm(post).dict(),
+            modified=post.updated_at or post.created_at,
+        )
+
+    @classmethod
+    def loads(cls, raw: bytes) -> "CachedPost":
+        item = orjson.loads(raw)
+        return cls(
+            data=item["data"],
+            modified=datetime.fromisoformat(item["modified"]),
+        )
+
+    def dumps(self) -> bytes:
+        return orjson.dumps({"data": self.data, "modified": self.modified})
+
+
+class PostCache:
+    """
+    Posts in a backend shared by all workers, fronted by a short lived
+    per-worker cache. Invalidations bump the shared key version and are
+    published so every worker evicts its local copy
+    """
+
+    channel = "sn_post_cache"
+
+    def __init__(
+        self,
+        backend: Optional[CacheBackend],
+        ttl: float,
+        local_size: int,
+        local_ttl: float,
+    ) -> None:
+        self.backend = backend
+        self.ttl = ttl
+        self.local = TTLCache(local_size, local_ttl)
+        # changes on every eviction, a read racing one is not kept locally
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    @staticmethod
+    def key(id: int) -> str:
+        return f"sn_post:{id}"
+
+    async def get(self, id: int) -> Optional[CachedPost]:
+        if self.backend is None:
+            return None
+        cached = self.local.get(id)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        generation = self.generation
+        try:
+            raw = await self.backend.get(self.key(id))
+        except Exception as e:
+            # the database still has it
+            self.failed("read", e)
+            return None
+        if raw is None:
+            self.misses += 1
+            return None
+        cached = CachedPost.loads(raw)
+        if generation == self.generation:
+            self.local.set(id, cached)
+        self.hits += 1
+        return cached
+
+    async def load(
+        self, id: int, loader: Callable[[], Awaitable[Post]]
+    ) -> CachedPost:
+        """
+        Cached post, or the loaded one which is then stored unless
+        the post was invalidated meanwhile. The loader must read from
+        the primary, a lagging replica could return a version older
+        than the invalidation
+        """
+        cached = await self.get(id)
+        if cached is not None:
+            return cached
+        if self.backend is None:
+            return CachedPost.from_post(await loader())
+        generation = self.generation
+        try:
+            version = await self.backend.version(self.key(id))
+        except Exception as e:
+            self.failed("read", e)
+            return CachedPost.from_post(await loader())
+        cached = CachedPost.from_post(await loader())
+        try:
+            stored = await self.backend.set_if_version(
+                self.key(id), version, cached.dumps(), self.ttl
+            )
+        except Exception as e:
+            self.failed("write", e)
+            return cached
+        if not stored:
+            self.rejected += 1
+        elif generation == self.generation:
+            self.local.set(id, cached)
+        return cached
+
+    async def invalidate(self, *ids: int) -> None:
+        if self.backend is None or not ids:
+            return
+        self.evict(ids)
+        self.invalidations += len(ids)
+        try:
+            for id in ids:
+                await self.backend.bump(self.key(id), self.ttl)
+            await self.backend.publish(self.channel, ",".join(map(str, ids)))
+        except Exception as e:
+            # shared entries expire with their ttl, drop what we hold
+            self.failed("invalidation", e)
+            self.local.clear()
+            self.generation += 1
+
+    def evict(self, ids: Iterable[int]) -> None:
+        self.generation += 1
+        for id in ids:
+            self.local.invalidate(id)
+
+    def failed(self, action: str, error: Exception) -> None:
+        self.errors += 1
+        log.warning(f"ERROR: post cache {action} failed: {error}")
+
+    async def run(self) -> None:
+        """
+        Evict local copies of posts invalidated by any worker
+        """
+        if self.backend is None:
+            return
+        while True:
+            try:
+                async for message in self.backend.subscribe(self.channel):
+                    self.evict(int(id) for id in message.split(","))
+            except Exception as e:
+                log.warning(f"ERROR: post cache subscription failed: {e}")
+            # invalidations may have been missed while disconnected
+            self.local.clear()
+            self.generation += 1
+            await asyncio.sleep(1)
+
+    async def close(self) -> None:
+        if self.backend is not None:
+            await self.backend.close()
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self.backend).__name__ if self.backend else None,
+            "local": self.local.stats(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "rejected_fills": self.rejected,
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+        }
+
+
+post_cache = PostCache(
+    create_cache_backend(settings.POST_CACHE_URL),
+    settings.POST_CACHE_TTL,
+    settings.POST_CACHE_LOCAL_SIZE,
+    settings.POST_CACHE_LOCAL_TTL,
+)
+metrics.register("post_cache", post_cache.stats)
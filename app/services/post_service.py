@@ -1,18 +1,52 @@
 from datetime import datetime
-from typing import Sequence
+from typing import Optional, Sequence
 
 from fastapi import Depends, HTTPException, Request
 
 from app import messages
-from app.mixins import PaginationMixin
+from app.conditional import entity_validators, weak_etag
+from app.mixins import (
+    PaginationMixin,
+    encode_cursor,
+    keyset_page,
+    offset_page,
+    parse_fields,
+    parse_keyset_cursor,
+)
 from app.models.post_model import Post
 from app.repositories.post_repository import PostRepository
+from app.schemas.base_schema import CountMode, PaginationMode
 from app.schemas.post_schema import (
     PostCreateSchema,
     PostSchema,
+    PostSearchSchema,
     UpdatePostSchema,
 )
+from app.services.feed_service import FeedService
 from app.services.like_service import LikeService
+from app.services.post_cache import CachedPost, post_cache
+
+VERSION_FIELDS = ("id", "created_at", "updated_at")
+
+
+def page_etag(
+    rows: Sequence,
+    mode: PaginationMode,
+    limit: int,
+    fields: Optional[str],
+    count: Optional[int],
+) -> str:
+    """
+    ETag of a page from ids and timestamps of its rows. Pages have no
+    Last-Modified, a row dropping off keeps the latest stamp as it was
+    """
+    return weak_etag(
+        mode.value,
+        limit,
+        fields,
+        count,
+        *(f"{row.id}@{row.updated_at or row.created_at}" for row in rows),
+    )
 
 
 class PostService(PaginationMixin):
@@ -23,6 +57,7 @@ class PostService(PaginationMixin):
 
     async def delete_post(self, id: int) -> None:
         await self.repository.update(id, {"deleted_at": datetime.now()})
+        await post_cache.invalidate(id)
 
     async def check_post_owner(self, id: int, user_id: int) -> bool:
         return await self.repository.exists(
@@ -37,7 +72,9 @@ class PostService(PaginationMixin):
                 detail=messages.ACTION_NOT_ALLOWED,
             )
 
-    async def check_and_delete_post(self, id: int, user_id: int) -> None:
+    async def check_and_delete_post(
+        self, id: int, user_id: int, feed_service: Optional[FeedService] = None
+    ) -> None:
         is_owner = await self.check_post_owner(id, user_id)
         if not is_owner:
             raise HTTPException(
@@ -45,6 +82,8 @@ class PostService(PaginationMixin):
                 detail=messages.ACTION_NOT_ALLOWED,
             )
         await self.delete_post(id)
+        if feed_service is not None:
+            await feed_service.remove_post(id)
 
     async def like_post(
         self, id: int, user_id: int, like_service: LikeService
@@ -58,16 +97,144 @@ class PostService(PaginationMixin):
         await self.check_self_post(id, user_id)
         await like_service.dislike(id, user_id)
 
-    async def get_list(self, offset: int, limit: int, *args: Sequence):
-        return await self.get_paginated(offset, limit, *args)
+    async def get_list(
+        self,
+        offset: int,
+        limit: int,
+        *args: Sequence,
+        count_mode: CountMode = CountMode.exact,
+        fields: Optional[str] = None,
+    ):
+        return await self.get_paginated(
+            offset,
+            limit,
+            *args,
+            count_mode=count_mode,
+            fields=parse_fields(fields, self.repository.projections),
+        )
+
+    async def get_cursor_list(
+        self,
+        cursor: Optional[str],
+        limit: int,
+        *args: Sequence,
+        fields: Optional[str] = None,
+    ):
+        return await self.get_cursor_paginated(
+            cursor,
+            limit,
+            *args,
+            fields=parse_fields(fields, self.repository.projections),
+        )
+
+    async def get_version(
+        self, id: int
+    ) -> Optional[tuple[str, Optional[datetime]]]:
+        """
+        Validators of a post from its timestamps only, None if missing
+        """
+        stamp = await self.repository.version(id)
+        if stamp is None:
+            return None
+        return entity_validators(id, stamp)
 
-    async def create_post(self, data: PostCreateSchema, request: Request):
+    async def get_first_page_version(
+        self,
+        limit: int,
+        mode: PaginationMode,
+        count_mode: CountMode = CountMode.exact,
+        fields: Optional[str] = None,
+    ) -> str:
+        """
+        ETag of the first page from ids and timestamps of its rows,
+        plus the count which offset pages carry
+        """
+        count = None
+        if mode is PaginationMode.cursor:
+            # one more row tells whether next_cursor is present
+            rows = await self.repository.seek(
+                limit + 1, None, fields=VERSION_FIELDS
+            )
+        else:
+            count, _ = await self.repository.count_by(count_mode)
+            rows = await self.repository.all(limit, 0, fields=VERSION_FIELDS)
+        return page_etag(rows, mode, limit, fields, count)
+
+    async def get_first_page(
+        self,
+        limit: int,
+        mode: PaginationMode,
+        count_mode: CountMode = CountMode.exact,
+        fields: Optional[str] = None,
+    ) -> tuple[dict, str]:
+        """
+        First page along with the ETag get_first_page_version
+        would give for it, taken from the fetched rows
+        """
+        names = parse_fields(fields, self.repository.projections)
+        selected = (
+            tuple(dict.fromkeys((*names, *VERSION_FIELDS))) if names else ()
+        )
+        count = None
+        if mode is PaginationMode.cursor:
+            rows = await self.repository.seek(limit + 1, None, fields=selected)
+            page = keyset_page(rows, limit, names)
+        else:
+            count, count_mode = await self.repository.count_by(count_mode)
+            rows = await self.repository.all(limit, 0, fields=selected)
+            page = offset_page(rows, count, count_mode, limit, 0, names)
+        return page, page_etag(rows, mode, limit, fields, count)
+
+    async def search(
+        self, text: str, cursor: Optional[str], limit: int
+    ) -> dict:
+        rows = await self.repository.search(
+            text, limit + 1, parse_keyset_cursor(cursor, float, int)
+        )
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].rank, rows[-1].Post.id)
+        return {
+            "limit": limit,
+            "next_cursor": next_cursor,
+            "data": [
+                PostSearchSchema(
+                    **PostSchema.from_orm(row.Post).dict(),
+                    rank=row.rank,
+                    snippet=row.snippet,
+                ).dict()
+                for row in rows
+            ],
+        }
+
+    async def create_post(
+        self,
+        data: PostCreateSchema,
+        request: Request,
+        feed_service: Optional[FeedService] = None,
+    ):
         data_dict = data.dict(exclude_none=True)
         data_dict.update({"owner": request.user.id})
-        return await self.repository.create(data_dict)
+        post = await self.repository.create(data_dict)
+        if feed_service is not None:
+            await feed_service.fan_out(post)
+        return post
 
     async def get_one(self, id: int) -> PostSchema:
         return await self.repository.get(id)
 
+    async def get_cached(self, id: int) -> Optional[CachedPost]:
+        return await post_cache.get(id)
+
+    async def get_one_cached(self, id: int) -> CachedPost:
+        # only a post that gets cached must not come from a lagging replica
+        primary = post_cache.backend is not None
+        return await post_cache.load(
+            id, lambda: self.repository.get(id, primary=primary)
+        )
+
     async def update(self, id: int, data: UpdatePostSchema) -> Post:
-        return await self.repository.update(id, data.dict(exclude_none=True))
+        post = await self.repository.update(id, data.dict(exclude_none=True))
+        await post_cache.invalidate(id)
+        return post
@@ -0,0 +1,30 @@
+from dataclasses import dataclass
+
+from app import metrics
+from app.cache import TTLCache
+from app.configs.environment import get_environment
+from app.models.user_model import User
+
+settings = get_environment()
+
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    Compact authenticated user kept in request.user
+    """
+
+    __slots__ = ("id", "login")
+
+    id: int
+    login: str
+
+    @classmethod
+    def from_user(cls, user: User, login: str) -> "Principal":
+        return cls(id=user.id, login=login)
+
+
+principal_cache = TTLCache(
+    settings.PRINCIPAL_CACHE_SIZE, settings.PRINCIPAL_CACHE_TTL
+)
+metrics.register("principal_cache", principal_cache.stats)
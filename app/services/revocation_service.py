@@ -0,0 +1,55 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Optional
+
+from app import metrics
+from app.configs.database import SessionFactory
+from app.repositories.user_repository import RevokedTokenRepository
+
+log = logging.getLogger(__name__)
+
+
+class TokenDenylist:
+    """
+    In-memory set of revoked access token ids,
+    periodically reloaded from sn_revoked_token
+    """
+
+    def __init__(self) -> None:
+        self.ids: frozenset[str] = frozenset()
+        self.refreshed_at: Optional[datetime] = None
+
+    def __contains__(self, jti: str) -> bool:
+        return jti in self.ids
+
+    def add(self, jti: str) -> None:
+        self.ids = self.ids | {jti}
+
+    async def refresh(self) -> None:
+        session = SessionFactory()
+        try:
+            self.ids = frozenset(
+                await RevokedTokenRepository(session).active_ids()
+            )
+            self.refreshed_at = datetime.utcnow()
+        finally:
+            await session.close()
+
+    async def run(self, interval: float) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                log.warning(f"ERROR: denylist refresh failed: {e}")
+            await asyncio.sleep(interval)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self.ids),
+            "refreshed_at": self.refreshed_at,
+        }
+
+
+denylist = TokenDenylist()
+metrics.register("token_denylist", denylist.stats)
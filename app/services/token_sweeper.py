@@ -0,0 +1,60 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Optional
+
+from app import metrics
+from app.configs.database import SessionFactory
+from app.configs.environment import get_environment
+from app.repositories.user_repository import RefreshTokenRepository
+
+log = logging.getLogger(__name__)
+
+
+class RefreshTokenSweeper:
+    """
+    Periodically deletes expired refresh tokens in bounded batches,
+    so no single statement holds many row locks
+    """
+
+    def __init__(self, batch_size: int) -> None:
+        self.batch_size = batch_size
+        self.deleted = 0
+        self.swept_at: Optional[datetime] = None
+
+    async def delete_batch(self) -> int:
+        session = SessionFactory()
+        try:
+            return await RefreshTokenRepository(session).delete_expired(
+                self.batch_size
+            )
+        finally:
+            await session.close()
+
+    async def sweep(self) -> int:
+        deleted = 0
+        while True:
+            count = await self.delete_batch()
+            deleted += count
+            if count < self.batch_size:
+                break
+        self.deleted += deleted
+        self.swept_at = datetime.utcnow()
+        return deleted
+
+    async def run(self, interval: float) -> None:
+        while True:
+            try:
+                await self.sweep()
+            except Exception as e:
+                log.warning(f"ERROR: refresh token sweep failed: {e}")
+            await asyncio.sleep(interval)
+
+    def stats(self) -> dict:
+        return {"deleted": self.deleted, "swept_at": self.swept_at}
+
+
+refresh_token_sweeper = RefreshTokenSweeper(
+    get_environment().REFRESH_TOKEN_SWEEP_BATCH
+)
+metrics.register("refresh_token_sweeper", refresh_token_sweeper.stats)
@@ -4,17 +4,21 @@ from typing import Optional, Union
 
 from fastapi import Depends
 
+from app.mixins import encode_cursor, parse_keyset_cursor
 from app.models.user_model import Credential, RefreshToken, User
 from app.repositories.user_repository import (
     CredentialRepository,
     RefreshTokenRepository,
+    RevokedTokenRepository,
     UserRepository,
 )
 from app.schemas.auth_schema import (
     CredentialSchema,
     RefreshTokenSchema,
     RegistrationSchema,
+    RevokedTokenSchema,
 )
+from app.schemas.user_schema import UserSchema, UserSearchSchema
 
 
 class UserService:
@@ -29,13 +33,31 @@ class UserService:
         last_name: Optional[str] = None,
         substr: Optional[str] = None,
         birth_date: Optional[date] = None,
-    ) -> list[User]:
-        return await self.repository.search(
+        limit: int = 20,
+        cursor: Optional[str] = None,
+    ) -> dict:
+        rows = await self.repository.search(
             first_name=first_name,
             last_name=last_name,
             substr=substr,
             birth_date=birth_date,
+            limit=limit + 1,
+            after=parse_keyset_cursor(cursor, float, int),
         )
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].rank, rows[-1].User.id)
+        return {
+            "limit": limit,
+            "next_cursor": next_cursor,
+            "data": [
+                UserSearchSchema(
+                    **UserSchema.from_orm(row.User).dict(), rank=row.rank
+                ).dict()
+                for row in rows
+            ],
+        }
 
     async def create(self, data: RegistrationSchema) -> User:
         return await self.repository.create(
@@ -65,13 +87,18 @@ class RefreshTokenService:
     def __init__(self, repository: RefreshTokenRepository = Depends()) -> None:
         self.repository = repository
 
-    async def get_or_none(self, *args: Sequence) -> Union[None, RefreshToken]:
-        return await self.repository.get_or_none(*args)
+    async def get_by_key_hash(self, key_hash: str) -> Optional[RefreshToken]:
+        return await self.repository.get_by_key_hash(key_hash)
 
-    async def delete(self, id: int) -> None:
-        await self.repository.delete(id)
+    async def upsert(self, data: RefreshTokenSchema) -> None:
+        await self.repository.upsert(data.dict())
 
-    async def create(
-        self, data: RefreshTokenSchema
-    ) -> Union[None, RefreshToken]:
-        return await self.repository.create(data.dict())
+
+class RevokedTokenService:
+    repository: RevokedTokenRepository
+
+    def __init__(self, repository: RevokedTokenRepository = Depends()) -> None:
+        self.repository = repository
+
+    async def revoke(self, data: RevokedTokenSchema) -> None:
+        await self.repository.revoke(data.dict())
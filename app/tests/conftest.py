@@ -2,6 +2,7 @@ import asyncio
 import logging
 import os
 import tempfile
+from datetime import date
 
 import alembic
 import httpx
@@ -136,3 +137,28 @@ async def client():
     app = get_application()
     async with httpx.AsyncClient(app=app, base_url="http://testing") as client:
         yield client
+
+
+@pytest_asyncio.fixture
+async def make_user(session):
+    from app.repositories.user_repository import UserRepository
+
+    async def make_user(**data):
+        data.setdefault("first_name", "first")
+        data.setdefault("last_name", "last")
+        data.setdefault("birth_date", date(2000, 1, 1))
+        return await UserRepository(session).create(data)
+
+    return make_user
+
+
+@pytest_asyncio.fixture
+async def make_post(session):
+    from app.repositories.post_repository import PostRepository
+
+    async def make_post(owner, **data):
+        data.setdefault("header", "header")
+        data.setdefault("body", "body")
+        return await PostRepository(session).create({"owner": owner, **data})
+
+    return make_post
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from app.admission import AdmissionGate
+from app.exceptions import ServiceOverloadedError
+
+
+async def test_gate_queues_then_rejects():
+    gate = AdmissionGate(concurrency=1, queue_size=1, retry_after=3)
+    release = asyncio.Event()
+
+    async def work():
+        async with gate:
+            await release.wait()
+
+    running = asyncio.create_task(work())
+    await asyncio.sleep(0)
+    queued = asyncio.create_task(work())
+    await asyncio.sleep(0)
+
+    with pytest.raises(ServiceOverloadedError) as exc_info:
+        async with gate:
+            pass
+    assert exc_info.value.retry_after == 3
+
+    release.set()
+    await asyncio.gather(running, queued)
+    assert gate.stats() == {
+        "active": 0,
+        "waiting": 0,
+        "admitted": 2,
+        "queued": 1,
+        "rejected": 1,
+    }
+
+
+async def test_freed_slot_goes_to_queued_request():
+    gate = AdmissionGate(concurrency=1, queue_size=1, retry_after=3)
+    await gate.__aenter__()
+    queued = asyncio.create_task(gate.__aenter__())
+    await asyncio.sleep(0)
+
+    await gate.__aexit__(None, None, None)
+
+    # handed over, a newcomer cannot take the slot before the waiter runs
+    assert gate.active == 1
+    late = asyncio.create_task(gate.__aenter__())
+    await queued
+    await asyncio.sleep(0)
+    assert not late.done()
+
+    await gate.__aexit__(None, None, None)
+    await late
+    await gate.__aexit__(None, None, None)
+    assert gate.stats()["active"] == 0
+
+
+async def test_cancelled_waiter_leaves_queue():
+    gate = AdmissionGate(concurrency=1, queue_size=1, retry_after=3)
+    release = asyncio.Event()
+
+    async def work():
+        async with gate:
+            await release.wait()
+
+    running = asyncio.create_task(work())
+    await asyncio.sleep(0)
+    queued = asyncio.create_task(work())
+    await asyncio.sleep(0)
+    queued.cancel()
+    await asyncio.gather(queued, return_exceptions=True)
+
+    assert gate.waiting == 0
+    release.set()
+    await running
+    assert gate.stats()["active"] == 0
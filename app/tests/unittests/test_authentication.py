@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta
+
+import pytest
+from jose import jwt
+from sqlalchemy.dialects import postgresql
+from starlette.authentication import AuthenticationError
+from starlette.requests import HTTPConnection
+
+from app.configs.environment import get_environment
+from app.middlewares.authentication import JWTAuthentication, token_cache
+from app.repositories.user_repository import RevokedTokenRepository
+from app.services.principal_service import Principal, principal_cache
+from app.services.revocation_service import denylist
+
+settings = get_environment()
+
+
+def make_connection(claims: dict) -> HTTPConnection:
+    claims.setdefault(
+        "expiration_date",
+        datetime.timestamp(datetime.utcnow() + timedelta(minutes=5)),
+    )
+    token = jwt.encode(claims, settings.SECRET_KEY, settings.HASH_ALGORITHM)
+    return HTTPConnection(
+        {
+            "type": "http",
+            "headers": [(b"authorization", f"Bearer {token}".encode())],
+        }
+    )
+
+
+@pytest.fixture(autouse=True)
+def clear_principals():
+    principal_cache.clear()
+    token_cache.clear()
+    yield
+    principal_cache.clear()
+    token_cache.clear()
+
+
+async def test_cached_principal_skips_database():
+    principal_cache.set("cached", Principal(id=7, login="cached"))
+    hits = principal_cache.hits
+
+    _, user = await JWTAuthentication().authenticate(
+        make_connection({"user": "cached"})
+    )
+
+    assert user == Principal(id=7, login="cached")
+    assert principal_cache.hits == hits + 1
+
+
+@pytest.fixture
+def stateless(monkeypatch):
+    monkeypatch.setattr(settings, "STATELESS_AUTH", True)
+    monkeypatch.setattr(denylist, "ids", frozenset())
+
+
+async def test_stateless_token_builds_principal_from_claims(stateless):
+    _, user = await JWTAuthentication().authenticate(
+        make_connection({"user": "stateless", "uid": 3, "jti": "a1"})
+    )
+
+    assert user == Principal(id=3, login="stateless")
+    assert principal_cache.get("stateless") is None
+
+
+async def test_stateless_revoked_token_rejected(stateless):
+    denylist.add("a1")
+
+    with pytest.raises(AuthenticationError):
+        await JWTAuthentication().authenticate(
+            make_connection({"user": "stateless", "uid": 3, "jti": "a1"})
+        )
+
+
+async def test_verified_payload_is_cached():
+    principal_cache.set("cached", Principal(id=7, login="cached"))
+    conn = make_connection({"user": "cached"})
+    hits = token_cache.hits
+
+    await JWTAuthentication().authenticate(conn)
+    await JWTAuthentication().authenticate(conn)
+
+    assert len(token_cache) == 1
+    assert token_cache.hits == hits + 1
+
+
+class RecordingSession:
+    def __init__(self) -> None:
+        self.info: dict = {}
+        self.statements: list = []
+
+    async def execute(self, query, params=None):
+        self.statements.append((query, params))
+
+    async def commit(self) -> None:
+        pass
+
+
+async def test_revoking_twice_is_noop():
+    session = RecordingSession()
+    repository = RevokedTokenRepository(session, session)
+
+    await repository.revoke({"jti": "abc", "valid_until": 1.0})
+    await repository.revoke({"jti": "abc", "valid_until": 1.0})
+
+    (first, params), (second, _) = session.statements
+    assert first is second
+    assert params == {"token_jti": "abc", "token_valid_until": 1.0}
+    sql = str(first.compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (jti) DO NOTHING" in sql
@@ -0,0 +1,109 @@
+import pytest
+
+from app.cache import CacheBackend, RedisCacheBackend, TTLCache
+
+
+def test_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["hits"] == 3
+    assert cache.stats()["misses"] == 1
+
+
+def test_cache_entry_expires():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1, ttl=0)
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_cache_invalidate_where():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set(("sn_post", 1), 1)
+    cache.set(("sn_post", 2), 2)
+    cache.set(("sn_user", 1), 3)
+
+    assert cache.invalidate_where(lambda key, _: key[0] == "sn_post") == 2
+    assert cache.get(("sn_user", 1)) == 3
+
+
+class RecordingPipeline:
+    def __init__(self, calls: list) -> None:
+        self.calls = calls
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+    def __getattr__(self, name):
+        return lambda *args: self.calls.append((name, *args))
+
+    async def execute(self):
+        return [3, True, 1]
+
+
+class RecordingRedis:
+    def __init__(self) -> None:
+        self.calls: list = []
+
+    def pipeline(self, transaction: bool):
+        return RecordingPipeline(self.calls)
+
+    async def script(self, keys, args):
+        self.calls.append(("script", *keys, *args))
+        return 1
+
+
+def make_redis_backend() -> RedisCacheBackend:
+    backend = RedisCacheBackend.__new__(RedisCacheBackend)
+    backend.client = RecordingRedis()
+    backend._set_if_version = backend.client.script
+    return backend
+
+
+async def test_redis_bump_expires_version():
+    backend = make_redis_backend()
+
+    assert await backend.bump("sn_post:1", ttl=300) == 3
+    assert backend.client.calls == [
+        ("incr", "sn_post:1:version"),
+        ("pexpire", "sn_post:1:version", 3000000),
+        ("delete", "sn_post:1"),
+    ]
+
+
+async def test_redis_fill_refreshes_version_expiry():
+    backend = make_redis_backend()
+
+    assert await backend.set_if_version("sn_post:1", 3, b"post", ttl=300)
+    assert backend.client.calls == [
+        (
+            "script",
+            "sn_post:1",
+            "sn_post:1:version",
+            3,
+            b"post",
+            300000,
+            3000000,
+        )
+    ]
+
+
+def test_incomplete_backend_fails_on_creation():
+    class GetOnlyBackend(CacheBackend):
+        async def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        GetOnlyBackend()
@@ -0,0 +1,122 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import Request
+
+from app.conditional import (
+    entity_validators,
+    etag_matches,
+    is_not_modified,
+    validator_headers,
+)
+from app.repositories.post_repository import PostRepository
+from app.schemas.base_schema import PaginationMode
+from app.services.post_service import PostService
+
+STAMP = datetime(2023, 1, 11, 22, 42, 8, 229353, tzinfo=timezone.utc)
+
+
+def make_request(**headers: str) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "headers": [
+                (name.replace("_", "-").lower().encode(), value.encode())
+                for name, value in headers.items()
+            ],
+        }
+    )
+
+
+def test_etag_changes_with_version():
+    etag, last_modified = entity_validators(1, STAMP)
+
+    assert etag.startswith('W/"')
+    assert etag == entity_validators(1, STAMP)[0]
+    assert etag != entity_validators(1, STAMP + timedelta(microseconds=1))[0]
+    assert etag != entity_validators(2, STAMP)[0]
+    assert last_modified == STAMP
+
+
+@pytest.mark.parametrize(
+    "header, matches",
+    [("*", True), ('"other", {etag}', True), ('"other"', False)],
+)
+def test_etag_matches(header, matches):
+    etag, _ = entity_validators(1, STAMP)
+    opaque = etag.removeprefix("W/")
+
+    assert etag_matches(header.format(etag=opaque), etag) is matches
+
+
+def test_if_none_match_wins_over_if_modified_since():
+    etag, last_modified = entity_validators(1, STAMP)
+    headers = validator_headers(etag, last_modified)
+
+    assert is_not_modified(
+        make_request(If_None_Match=etag), etag, last_modified
+    )
+    assert not is_not_modified(
+        make_request(
+            If_None_Match='W/"stale"',
+            If_Modified_Since=headers["Last-Modified"],
+        ),
+        etag,
+        last_modified,
+    )
+
+
+def test_if_modified_since_ignores_sub_seconds():
+    etag, last_modified = entity_validators(1, STAMP)
+    since = validator_headers(etag, last_modified)["Last-Modified"]
+
+    assert is_not_modified(
+        make_request(If_Modified_Since=since), etag, last_modified
+    )
+    assert not is_not_modified(
+        make_request(If_Modified_Since=since),
+        etag,
+        last_modified + timedelta(seconds=1),
+    )
+    assert not is_not_modified(
+        make_request(If_Modified_Since="garbage"), etag, last_modified
+    )
+
+
+@pytest.mark.parametrize("mode", list(PaginationMode))
+@pytest.mark.parametrize("fields", [None, "id,preview"])
+async def test_first_page_validators_match_metadata(
+    session, make_user, make_post, mode, fields
+):
+    owner = await make_user()
+    post = await make_post(owner.id)
+    await make_post(owner.id)
+    await PostRepository(session).update(post.id, {"header": "changed"})
+    service = PostService(PostRepository(session))
+
+    page, etag = await service.get_first_page(2, mode, fields=fields)
+
+    assert len(page["data"]) == 2
+    assert etag == await service.get_first_page_version(2, mode, fields=fields)
+
+
+async def test_first_page_etag_changes_when_post_drops_off(
+    session, make_user, make_post
+):
+    owner = await make_user()
+    older = await make_post(owner.id)
+    dropped = await make_post(owner.id)
+    await make_post(owner.id)
+    service = PostService(PostRepository(session))
+    _, etag = await service.get_first_page(2, PaginationMode.cursor)
+
+    await PostRepository(session).update(
+        dropped.id, {"deleted_at": datetime.now()}
+    )
+    page, changed = await service.get_first_page(2, PaginationMode.cursor)
+
+    assert older.id in [post["id"] for post in page["data"]]
+    assert changed != etag
+    # without Last-Modified a bare If-Modified-Since never gets a 304
+    request = make_request(If_Modified_Since="Fri, 01 Jan 2100 00:00:00 GMT")
+    assert not is_not_modified(request, changed)
@@ -0,0 +1,54 @@
+from collections import namedtuple
+from datetime import datetime
+
+from app.repositories.post_repository import PostRepository
+from app.schemas.post_schema import ExportFormat
+from app.services.export_service import ExportService
+
+ExportRow = namedtuple(
+    "ExportRow", [column.key for column in PostRepository.export_columns]
+)
+
+
+def make_row(id: int) -> ExportRow:
+    created_at = datetime(2023, 1, 1)
+    return ExportRow(id, "header", "body, with comma", 1, 0, created_at, None)
+
+
+class ChunkedRepository:
+    export_columns = PostRepository.export_columns
+
+    def __init__(self, chunks) -> None:
+        self.chunks = chunks
+
+    async def stream_rows(self, chunk_size: int):
+        for chunk in self.chunks:
+            yield chunk
+
+
+async def collect(service: ExportService, format: ExportFormat) -> bytes:
+    return b"".join([chunk async for chunk in service.export_posts(format, 2)])
+
+
+async def test_export_ndjson_line_per_row():
+    service = ExportService(ChunkedRepository([[make_row(1), make_row(2)]]))
+
+    lines = (await collect(service, ExportFormat.ndjson)).splitlines()
+
+    assert len(lines) == 2
+    assert lines[0].startswith(b'{"id":1,"header":"header"')
+    assert b'"created_at":"2023-01-01T00:00:00"' in lines[0]
+
+
+async def test_export_csv_writes_header_once():
+    service = ExportService(
+        ChunkedRepository([[make_row(1), make_row(2)], [make_row(3)]])
+    )
+
+    lines = (await collect(service, ExportFormat.csv)).splitlines()
+
+    assert lines[0] == (
+        b"id,header,body,owner,like_count,created_at,updated_at"
+    )
+    assert len(lines) == 4
+    assert b'"body, with comma"' in lines[3]
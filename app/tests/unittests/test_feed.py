@@ -0,0 +1,81 @@
+from app.repositories.feed_repository import FeedRepository
+from app.repositories.follow_repository import FollowRepository
+
+THRESHOLD = 2
+
+
+async def feed_ids(session, user_id):
+    posts = await FeedRepository(session).home_timeline(user_id, 10, None)
+    return [post.id for post in posts]
+
+
+async def publish(session, make_post, owner):
+    post = await make_post(owner)
+    await FeedRepository(session).fan_out(post, THRESHOLD)
+    return post
+
+
+async def test_post_is_pushed_below_threshold(session, make_user, make_post):
+    author, reader = await make_user(), await make_user()
+    await FollowRepository(session).follow(reader.id, author.id, backfill=0)
+
+    post = await publish(session, make_post, author.id)
+
+    await session.refresh(post)
+    assert post.fanned_out
+    assert await feed_ids(session, reader.id) == [post.id]
+
+
+async def test_post_is_pulled_at_threshold(session, make_user, make_post):
+    author = await make_user()
+    readers = [await make_user(), await make_user()]
+    for reader in readers:
+        await FollowRepository(session).follow(
+            reader.id, author.id, backfill=0
+        )
+
+    post = await publish(session, make_post, author.id)
+
+    await session.refresh(post)
+    assert not post.fanned_out
+    for reader in readers:
+        assert await feed_ids(session, reader.id) == [post.id]
+
+
+async def test_pulled_post_survives_author_dropping_below_threshold(
+    session, make_user, make_post
+):
+    author, reader, leaver = (
+        await make_user(),
+        await make_user(),
+        await make_user(),
+    )
+    follows = FollowRepository(session)
+    await follows.follow(reader.id, author.id, backfill=0)
+    await follows.follow(leaver.id, author.id, backfill=0)
+    pulled = await publish(session, make_post, author.id)
+
+    await follows.unfollow(leaver.id, author.id)
+    pushed = await publish(session, make_post, author.id)
+
+    assert await feed_ids(session, reader.id) == [pushed.id, pulled.id]
+    assert await feed_ids(session, leaver.id) == []
+
+
+async def test_pushed_post_survives_author_crossing_threshold(
+    session, make_user, make_post
+):
+    author, reader, joiner = (
+        await make_user(),
+        await make_user(),
+        await make_user(),
+    )
+    follows = FollowRepository(session)
+    await follows.follow(reader.id, author.id, backfill=0)
+    pushed = await publish(session, make_post, author.id)
+
+    await follows.follow(joiner.id, author.id, backfill=0)
+    pulled = await publish(session, make_post, author.id)
+
+    assert await feed_ids(session, reader.id) == [pulled.id, pushed.id]
+    assert await feed_ids(session, joiner.id) == [pulled.id]
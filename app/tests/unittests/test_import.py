@@ -0,0 +1,105 @@
+from datetime import date
+
+from sqlalchemy import select
+
+from app.models.user_model import Credential
+from app.repositories.post_repository import post_staging
+from app.repositories.user_repository import UserRepository
+from app.schemas.import_schema import ImportKind
+from app.schemas.post_schema import ExportFormat
+from app.services.import_service import ImportService, iter_lines
+
+
+async def chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+class StagingRepository:
+    staging = post_staging
+
+    def __init__(self) -> None:
+        self.staged: list = []
+
+    async def stage(self, records) -> None:
+        self.staged.append(records)
+
+    async def merge_staged(self) -> int:
+        return len(self.staged[-1])
+
+    def invalidate_count_cache(self) -> None:
+        pass
+
+
+async def test_iter_lines_joins_split_chunks():
+    lines = iter_lines(chunks(b'{"a": 1}\n{"a"', b": 2}\n\xd0", b"\xb9"))
+
+    assert [line async for line in lines] == [
+        '{"a": 1}\n',
+        '{"a": 2}\n',
+        "й",
+    ]
+
+
+async def test_import_batches_and_rejects_invalid_records():
+    repository = StagingRepository()
+    service = ImportService(None, repository)
+    source = (
+        b"id,header,body,owner,created_at\n"
+        b'1,first,"multi\nline, body",7,\n'
+        b"2,,empty header,7,\n"
+        b"3,third,body,7,2023-01-01T00:00:00+00:00\n"
+        b"broken\n"
+    )
+
+    report = await service.import_records(
+        ImportKind.posts, ExportFormat.csv, iter_lines(chunks(source)), 2
+    )
+
+    assert report["received"] == 4
+    assert report["rejected"] == 2
+    assert report["inserted"] == 2
+    assert [batch["inserted"] for batch in report["batches"]] == [1, 1]
+    assert repository.staged[0] == [(1, "first", "multi\nline, body", 7, None)]
+
+
+async def test_import_accepts_headers_up_to_model_length():
+    repository = StagingRepository()
+    service = ImportService(None, repository)
+    source = b"".join(
+        b'{"id": %d, "header": "%s", "body": "body", "owner": 7}\n'
+        % (id, b"h" * length)
+        for id, length in ((1, 100), (2, 101))
+    )
+
+    report = await service.import_records(
+        ImportKind.posts, ExportFormat.ndjson, iter_lines(chunks(source)), 10
+    )
+
+    assert report["rejected"] == 1
+    assert repository.staged[0] == [(1, "h" * 100, "body", 7, None)]
+
+
+async def test_merge_staged_users_keeps_one_row_per_id(session, make_user):
+    id = (await make_user()).id + 1000
+    password = "$2b$12$" + "a" * 53
+    birth_date = date(2000, 1, 1)
+    repository = UserRepository(session)
+
+    await repository.stage(
+        [
+            (id, "a", "a", birth_date, f"import{id}a", password, None),
+            (id, "b", "b", birth_date, f"import{id}b", password, None),
+            (id + 1, "c", "c", birth_date, f"import{id}a", password, None),
+            (id + 2, "d", "d", birth_date, f"import{id}d", password, None),
+        ]
+    )
+    inserted = await repository.merge_staged()
+
+    result = await session.execute(
+        select(Credential.user_id, Credential.login)
+        .where(Credential.user_id.between(id, id + 2))
+        .order_by(Credential.user_id)
+    )
+    assert inserted == 2
+    assert result.all() == [(id, f"import{id}a"), (id + 2, f"import{id}d")]
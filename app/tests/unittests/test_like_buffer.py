@@ -0,0 +1,73 @@
+import pytest
+
+from app.exceptions import ServiceOverloadedError
+from app.services.like_buffer import LikeBuffer
+
+
+class RecordingBuffer(LikeBuffer):
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.writes: list = []
+
+    async def write(self, likes, dislikes) -> None:
+        self.writes.append((likes, dislikes))
+
+
+async def test_buffer_coalesces_toggles():
+    buffer = RecordingBuffer(max_size=100, interval=60, max_pending=100)
+    buffer.add(1, 10, liked=True)
+    buffer.add(1, 10, liked=False)
+    buffer.add(1, 10, liked=True)
+    buffer.add(2, 10, liked=False)
+
+    await buffer.flush()
+
+    assert buffer.writes == [([(1, 10)], [(2, 10)])]
+    stats = buffer.stats()
+    assert stats["depth"] == 0
+    assert stats["coalescing_ratio"] == 2
+
+
+async def test_buffer_signals_when_full():
+    buffer = RecordingBuffer(max_size=2, interval=60, max_pending=100)
+    buffer.add(1, 10, liked=True)
+    assert not buffer.full.is_set()
+
+    buffer.add(2, 10, liked=True)
+
+    assert buffer.full.is_set()
+
+
+class FailingBuffer(LikeBuffer):
+    async def write(self, likes, dislikes) -> None:
+        # more intents arrive while the database is down
+        self.add(3, 10, liked=True)
+        self.add(4, 10, liked=True)
+        raise ConnectionError
+
+
+async def test_buffer_rejects_new_intents_when_full():
+    buffer = RecordingBuffer(max_size=100, interval=0.5, max_pending=2)
+    buffer.add(1, 10, liked=True)
+    buffer.add(2, 10, liked=True)
+    buffer.add(2, 10, liked=False)
+
+    with pytest.raises(ServiceOverloadedError) as exc_info:
+        buffer.add(3, 10, liked=True)
+
+    assert exc_info.value.retry_after == 1
+    assert buffer.pending == {(1, 10): True, (2, 10): False}
+    assert buffer.stats()["rejected"] == 1
+
+
+async def test_failed_flush_sheds_beyond_cap():
+    buffer = FailingBuffer(max_size=100, interval=60, max_pending=3)
+    buffer.add(1, 10, liked=True)
+    buffer.add(2, 10, liked=True)
+
+    with pytest.raises(ConnectionError):
+        await buffer.flush()
+
+    assert len(buffer.pending) == 3
+    assert (3, 10) in buffer.pending and (4, 10) in buffer.pending
+    assert buffer.stats()["shed"] == 1
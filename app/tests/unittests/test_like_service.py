@@ -0,0 +1,82 @@
+from sqlalchemy import select
+
+from app.models.post_model import Post
+from app.repositories.like_repository import LikeRepository
+from app.services.like_service import LikeService
+
+
+async def like_counts(session, *post_ids):
+    result = await session.execute(
+        select(Post.id, Post.like_count).where(Post.id.in_(post_ids))
+    )
+    return dict(result.all())
+
+
+async def test_like_many_returns_changed_ids(session, make_user, make_post):
+    owner, liker = await make_user(), await make_user()
+    first, second = await make_post(owner.id), await make_post(owner.id)
+    service = LikeService(LikeRepository(session))
+
+    liked = await service.like_many([first.id, second.id], liker.id)
+    again = await service.like_many([first.id, second.id], liker.id)
+
+    assert sorted(liked) == [first.id, second.id]
+    assert again == []
+    assert await like_counts(session, first.id, second.id) == {
+        first.id: 1,
+        second.id: 1,
+    }
+
+
+async def test_like_many_ignores_duplicate_ids(session, make_user, make_post):
+    owner, liker = await make_user(), await make_user()
+    post = await make_post(owner.id)
+    service = LikeService(LikeRepository(session))
+
+    liked = await service.like_many([post.id, post.id, post.id], liker.id)
+
+    assert liked == [post.id]
+    assert await like_counts(session, post.id) == {post.id: 1}
+
+
+async def test_like_many_skips_missing_and_own_posts(
+    session, make_user, make_post
+):
+    owner, liker = await make_user(), await make_user()
+    post, own = await make_post(owner.id), await make_post(liker.id)
+    service = LikeService(LikeRepository(session))
+
+    liked = await service.like_many([post.id, own.id, 2**31 - 1], liker.id)
+
+    assert liked == [post.id]
+    assert await like_counts(session, own.id) == {own.id: 0}
+
+
+async def test_dislike_many_returns_changed_ids(session, make_user, make_post):
+    owner, liker = await make_user(), await make_user()
+    liked, untouched = await make_post(owner.id), await make_post(owner.id)
+    service = LikeService(LikeRepository(session))
+    await service.like_many([liked.id], liker.id)
+
+    disliked = await service.dislike_many(
+        [liked.id, liked.id, untouched.id, 2**31 - 1], liker.id
+    )
+
+    assert disliked == [liked.id]
+    assert await like_counts(session, liked.id, untouched.id) == {
+        liked.id: 0,
+        untouched.id: 0,
+    }
+
+
+async def test_like_and_dislike_adjust_count(session, make_user, make_post):
+    owner, liker = await make_user(), await make_user()
+    post = await make_post(owner.id)
+    service = LikeService(LikeRepository(session))
+
+    await service.like(post.id, liker.id)
+    await service.like(post.id, liker.id)
+    assert await like_counts(session, post.id) == {post.id: 1}
+
+    await service.dislike(post.id, liker.id)
+    assert await like_counts(session, post.id) == {post.id: 0}
@@ -0,0 +1,63 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+from app.exceptions import InvalidCursorError
+from app.mixins import decode_cursor, encode_cursor, keyset_page, parse_fields
+from app.repositories.post_repository import PostRepository
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2023, 1, 11, 22, 42, 8, 229353, tzinfo=timezone.utc)
+    cursor = encode_cursor(created_at, 42)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor, datetime, int) == (created_at, 42)
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "W10", "WzFd"])
+def test_cursor_invalid(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, datetime, int)
+
+
+def test_parse_fields():
+    allowed = PostRepository.projections
+
+    assert parse_fields(None, allowed) == ()
+    assert parse_fields("id, preview,id", allowed) == ("id", "preview")
+    with pytest.raises(HTTPException) as e:
+        parse_fields("id,password", allowed)
+    assert e.value.status_code == 400
+
+
+def test_projected_query_selects_only_fields():
+    repository = PostRepository.__new__(PostRepository)
+    query = repository.projected(repository.base_select, ("id", "preview"))
+    sql = str(query.compile(dialect=postgresql.dialect()))
+
+    assert "left(sn_post.body" in sql
+    assert "sn_post.header" not in sql
+
+
+def test_keyset_page_strips_cursor_columns():
+    created_at = datetime(2023, 1, 11, tzinfo=timezone.utc)
+    rows = []
+    for id in (3, 2, 1):
+        mapping = {
+            "id": id,
+            "header": f"header {id}",
+            "created_at": created_at,
+        }
+        rows.append(SimpleNamespace(_mapping=mapping, **mapping))
+
+    page = keyset_page(rows, 2, ("header",))
+
+    assert page["data"] == [{"header": "header 3"}, {"header": "header 2"}]
+    assert decode_cursor(page["next_cursor"], datetime, int) == (
+        created_at,
+        2,
+    )
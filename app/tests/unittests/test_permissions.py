@@ -11,6 +11,12 @@ from starlette.authentication import (
 from starlette.middleware.authentication import AuthenticationMiddleware
 from starlette.requests import HTTPConnection
 
+from app.configs.environment import get_environment
+from app.routes.v2.metrics_routes import router as metrics_router
+from app.routes.v2.post_routes import router as post_router
+from app.services.export_service import ExportService
+from app.services.principal_service import Principal
+
 
 class FakeAuthentication(AuthenticationBackend):
     def init(
@@ -66,3 +72,74 @@ async def test_permission_handler_noauth(app_permissioned):
 
     response = client.get("/ultra/", headers={"Authorization": "test 99"})
     assert response.status_code == 403
+
+
+class PrincipalAuthentication(AuthenticationBackend):
+    async def authenticate(self, conn: HTTPConnection):
+        login = conn.headers.get("Authorization")
+        if login is None:
+            return AuthCredentials(), None
+        return AuthCredentials(["authenticated"]), Principal(id=1, login=login)
+
+
+@pytest.fixture
+def app_metrics(monkeypatch):
+    monkeypatch.setattr(get_environment(), "ADMIN_LOGINS", ["admin"])
+    app = FastAPI()
+    app.add_middleware(
+        AuthenticationMiddleware, backend=PrincipalAuthentication()
+    )
+    app.include_router(metrics_router)
+    return app
+
+
+@pytest.mark.parametrize(
+    "headers, status_code",
+    [
+        ({}, 401),
+        ({"Authorization": "user"}, 403),
+        ({"Authorization": "admin"}, 200),
+    ],
+)
+async def test_metrics_require_admin(app_metrics, headers, status_code):
+    client = TestClient(app_metrics)
+
+    response = client.get("/metrics/", headers=headers)
+    assert response.status_code == status_code
+
+
+class EmptyRepository:
+    export_columns = ()
+
+    async def stream_rows(self, chunk_size: int):
+        return
+        yield
+
+
+@pytest.fixture
+def app_export(monkeypatch):
+    monkeypatch.setattr(get_environment(), "ADMIN_LOGINS", ["admin"])
+    app = FastAPI()
+    app.add_middleware(
+        AuthenticationMiddleware, backend=PrincipalAuthentication()
+    )
+    app.include_router(post_router)
+    app.dependency_overrides[ExportService] = lambda: ExportService(
+        EmptyRepository()
+    )
+    return app
+
+
+@pytest.mark.parametrize(
+    "headers, status_code",
+    [
+        ({}, 401),
+        ({"Authorization": "user"}, 403),
+        ({"Authorization": "admin"}, 200),
+    ],
+)
+async def test_export_requires_admin(app_export, headers, status_code):
+    client = TestClient(app_export)
+
+    response = client.get("/posts/export/", headers=headers)
+    assert response.status_code == status_code
@@ -0,0 +1,170 @@
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache import MemoryCacheBackend
+from app.models.post_model import Post
+from app.repositories.post_repository import PostRepository
+from app.services import post_service
+from app.services.post_cache import CachedPost, PostCache
+from app.services.post_service import PostService
+
+STAMP = datetime(2023, 1, 11, 22, 42, 8, 229353, tzinfo=timezone.utc)
+
+
+def make_post(header: str = "header") -> Post:
+    return Post(
+        id=1,
+        header=header,
+        body="body",
+        owner=1,
+        like_count=0,
+        created_at=STAMP,
+        updated_at=None,
+    )
+
+
+def make_cache(backend: MemoryCacheBackend) -> PostCache:
+    return PostCache(backend, ttl=60, local_size=100, local_ttl=60)
+
+
+def test_cached_post_round_trip():
+    cached = CachedPost.from_post(make_post())
+
+    assert CachedPost.loads(cached.dumps()) == cached
+    assert cached.modified == STAMP
+
+
+async def test_load_fills_shared_cache():
+    backend = MemoryCacheBackend()
+    worker, other = make_cache(backend), make_cache(backend)
+    loads = []
+
+    async def loader():
+        loads.append(1)
+        return make_post()
+
+    await worker.load(1, loader)
+    cached = await other.load(1, loader)
+
+    assert len(loads) == 1
+    assert cached.data["header"] == "header"
+
+
+async def test_late_fill_does_not_overwrite_invalidation():
+    backend = MemoryCacheBackend()
+    worker, writer = make_cache(backend), make_cache(backend)
+
+    async def stale_loader():
+        # the post is updated while its old version is being read
+        await writer.invalidate(1)
+        return make_post("old")
+
+    cached = await worker.load(1, stale_loader)
+
+    assert cached.data["header"] == "old"
+    assert await backend.get(PostCache.key(1)) is None
+    assert worker.stats()["rejected_fills"] == 1
+
+
+async def test_invalidation_evicts_other_workers():
+    backend = MemoryCacheBackend()
+    worker, writer = make_cache(backend), make_cache(backend)
+
+    async def loader():
+        return make_post()
+
+    task = asyncio.create_task(worker.run())
+    await asyncio.sleep(0)
+    await worker.load(1, loader)
+    assert worker.local.get(1) is not None
+
+    await writer.invalidate(1)
+    await asyncio.sleep(0)
+
+    assert worker.local.get(1) is None
+    assert await worker.get(1) is None
+    task.cancel()
+
+
+class StaticSession(AsyncSession):
+    def __init__(self, post: Post) -> None:
+        super().__init__()
+        self.post = post
+
+    async def execute(self, query, params=None):
+        return SimpleNamespace(scalars=lambda: SimpleNamespace(one=self.one))
+
+    def one(self) -> Post:
+        return self.post
+
+
+async def test_fill_reads_primary_after_invalidation(monkeypatch):
+    backend = MemoryCacheBackend()
+    worker, writer = make_cache(backend), make_cache(backend)
+    monkeypatch.setattr(post_service, "post_cache", worker)
+    # the replica has not caught up with the update yet
+    repository = PostRepository(
+        StaticSession(make_post("new")), StaticSession(make_post("old"))
+    )
+    await writer.invalidate(1)
+
+    cached = await PostService(repository).get_one_cached(1)
+
+    assert cached.data["header"] == "new"
+    stored = CachedPost.loads(await backend.get(PostCache.key(1)))
+    assert stored.data["header"] == "new"
+
+
+async def test_disabled_cache_reads_replica(monkeypatch):
+    monkeypatch.setattr(
+        post_service, "post_cache", PostCache(None, 60, 100, 60)
+    )
+    repository = PostRepository(
+        StaticSession(make_post("primary")),
+        StaticSession(make_post("replica")),
+    )
+
+    cached = await PostService(repository).get_one_cached(1)
+
+    assert cached.data["header"] == "replica"
+
+
+class BrokenBackend(MemoryCacheBackend):
+    async def get(self, key):
+        raise ConnectionError("backend down")
+
+    async def version(self, key):
+        raise ConnectionError("backend down")
+
+    async def bump(self, key, ttl):
+        raise ConnectionError("backend down")
+
+
+async def test_backend_errors_fall_through_to_loader():
+    cache = make_cache(BrokenBackend())
+
+    async def loader():
+        return make_post()
+
+    assert await cache.get(1) is None
+    cached = await cache.load(1, loader)
+
+    assert cached.data["header"] == "header"
+    # load tried get and version before loading
+    assert cache.stats()["errors"] == 3
+
+
+async def test_failed_invalidation_clears_local_cache():
+    cache = make_cache(BrokenBackend())
+    cache.local.set(1, CachedPost.from_post(make_post()))
+    cache.local.set(2, CachedPost.from_post(make_post()))
+    generation = cache.generation
+
+    await cache.invalidate(1)
+
+    assert cache.local.get(2) is None
+    assert cache.generation > generation
+    assert cache.stats()["errors"] == 1
@@ -0,0 +1,68 @@
+from types import SimpleNamespace
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.configs import database
+from app.configs.database import (
+    ReplicaSet,
+    create_engine,
+    get_read_session,
+    replica_settings,
+)
+from app.repositories.user_repository import UserRepository
+
+
+def make_replicas(*hosts: str) -> ReplicaSet:
+    engines = [
+        create_engine(replica_settings(database.ENV, host)) for host in hosts
+    ]
+    return ReplicaSet(engines, eject_seconds=60)
+
+
+def test_replica_settings_parse_port():
+    env = replica_settings(database.ENV, "replica-1:6432")
+
+    assert env.DATABASE_HOST == "replica-1"
+    assert env.DATABASE_PORT == 6432
+
+
+def test_replicas_round_robin_skips_ejected():
+    replicas = make_replicas("replica-1", "replica-2")
+    first, second = replicas.engines
+
+    assert [replicas.choose() for _ in range(3)] == [first, second, first]
+
+    replicas.eject(1)
+
+    assert [replicas.choose() for _ in range(2)] == [first, first]
+    replicas.eject(0)
+    assert replicas.choose() is None
+
+
+async def consume(request, session):
+    dependency = get_read_session(request, session)
+    read_session = await dependency.__anext__()
+    await dependency.aclose()
+    return read_session
+
+
+async def test_read_session_after_own_write(monkeypatch):
+    monkeypatch.setattr(database, "replicas", make_replicas("replica-1"))
+    primary = object()
+    user = SimpleNamespace(id=42)
+    get = SimpleNamespace(method="GET", scope={"user": user})
+    post = SimpleNamespace(method="POST", scope={"user": user})
+
+    assert await consume(get, primary) is not primary
+    assert await consume(post, primary) is primary
+    assert await consume(get, primary) is primary
+
+    database.recent_writers.clear()
+
+
+def test_repository_built_directly_reads_from_session():
+    session = AsyncSession()
+
+    repository = UserRepository(session)
+
+    assert repository.read_session is session
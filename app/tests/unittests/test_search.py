@@ -0,0 +1,122 @@
+from datetime import date
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+from app.mixins import encode_cursor
+from app.repositories.post_repository import PostRepository
+from app.repositories.user_repository import UserRepository
+from app.services.post_service import PostService
+from app.services.user_service import UserService
+
+
+class RecordingSession:
+    def __init__(self, rows) -> None:
+        self.rows = rows
+        self.statements: list = []
+
+    async def execute(self, query, params=None):
+        self.statements.append(query)
+        return SimpleNamespace(all=lambda: self.rows)
+
+
+def compiled(query):
+    return query.compile(dialect=postgresql.dialect())
+
+
+def post_row(id, rank):
+    post = SimpleNamespace(id=id, header="header", body="body", like_count=0)
+    return SimpleNamespace(Post=post, rank=rank, snippet="<b>body</b>")
+
+
+def user_row(id, rank):
+    user = SimpleNamespace(
+        id=id, first_name="first", last_name="last", birth_date=date.today()
+    )
+    return SimpleNamespace(User=user, rank=rank)
+
+
+async def test_post_search_query():
+    session = RecordingSession([])
+    await PostRepository(session).search("fast cars", 11, None)
+
+    query = compiled(session.statements[0])
+    sql = str(query)
+    assert "websearch_to_tsquery" in sql
+    assert "sn_post.search_vector @@ websearch_to_tsquery" in sql
+    assert "ts_headline" in sql
+    assert "DESC, sn_post.id DESC \n LIMIT" in sql
+    assert "sn_post.deleted_at IS NULL" in sql
+    assert "fast cars" in query.params.values()
+    assert 11 in query.params.values()
+
+
+async def test_post_search_cursor_round_trip():
+    session = RecordingSession([post_row(3, 0.5), post_row(2, 0.25)])
+    service = PostService(PostRepository(session))
+
+    page = await service.search("cars", None, 1)
+    assert [post["id"] for post in page["data"]] == [3]
+    assert page["next_cursor"] == encode_cursor(0.5, 3)
+
+    await service.search("cars", page["next_cursor"], 1)
+
+    query = compiled(session.statements[-1])
+    assert "(ts_rank_cd(sn_post.search_vector, websearch_to_tsquery" in str(
+        query
+    )
+    assert "sn_post.id) < (" in str(query)
+    assert {0.5, 3} <= set(query.params.values())
+
+
+async def test_user_search_query():
+    session = RecordingSession([])
+    await UserRepository(session).search(None, "Doe", "jo_%", None, 21)
+
+    query = compiled(session.statements[0])
+    sql = str(query)
+    assert "sn_user.last_name ILIKE" in sql
+    assert "ESCAPE '\\\\'" in sql
+    assert "greatest(similarity(sn_user.first_name" in sql
+    assert "DESC, sn_user.id DESC \n LIMIT" in sql
+    assert "%jo\\_\\%%" in query.params.values()
+    assert "Doe" in query.params.values()
+
+
+async def test_user_search_cursor_round_trip():
+    session = RecordingSession([user_row(9, 0.75), user_row(4, 0.5)])
+    service = UserService(UserRepository(session))
+
+    page = await service.search_user(substr="jo", limit=1)
+    assert [user["id"] for user in page["data"]] == [9]
+    assert page["next_cursor"] == encode_cursor(0.75, 9)
+
+    await service.search_user(substr="jo", limit=1, cursor=page["next_cursor"])
+
+    query = compiled(session.statements[-1])
+    assert "sn_user.id) < (" in str(query)
+    assert {0.75, 9} <= set(query.params.values())
+
+
+async def test_post_search_pages(session, make_user, make_post):
+    owner = await make_user()
+    # the database outlives a test, keep the term unique
+    term = f"gearbox{owner.id}"
+    other = await make_post(owner.id, header="other", body="nothing here")
+    matches = [
+        await make_post(owner.id, header=term, body=f"{term} {term}"),
+        await make_post(owner.id, header=term, body=f"about a {term}"),
+        await make_post(owner.id, header="note", body=f"a {term}"),
+    ]
+    service = PostService(PostRepository(session))
+
+    found, cursor = [], None
+    while True:
+        page = await service.search(term, cursor, 2)
+        found += [post["id"] for post in page["data"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert found == [post.id for post in matches]
+    assert other.id not in found
@@ -0,0 +1,99 @@
+from datetime import date, datetime, timedelta
+
+import httpx
+from fastapi import Depends, FastAPI, Request
+from jose import jwt
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from starlette.middleware.authentication import AuthenticationMiddleware
+
+from app.configs import database
+from app.configs.database import on_checkin, on_checkout
+from app.configs.environment import get_environment
+from app.middlewares.authentication import JWTAuthentication
+from app.middlewares.session import SessionMiddleware, hold_stats
+from app.models.user_model import Credential, User
+from app.repositories.user_repository import UserRepository
+from app.services.principal_service import principal_cache
+
+settings = get_environment()
+
+
+def make_token(login: str) -> str:
+    claims = {
+        "user": login,
+        "expiration_date": datetime.timestamp(
+            datetime.utcnow() + timedelta(minutes=5)
+        ),
+    }
+    return jwt.encode(claims, settings.SECRET_KEY, settings.HASH_ALGORITHM)
+
+
+async def test_request_shares_one_session(monkeypatch, tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/db.sqlite")
+    async with engine.begin() as connection:
+        await connection.run_sync(
+            User.metadata.create_all,
+            tables=[User.__table__, Credential.__table__],
+        )
+        await connection.execute(
+            User.__table__.insert().values(
+                id=1,
+                first_name="a",
+                last_name="b",
+                birth_date=date.today(),
+                updated_at=datetime.now(),
+            )
+        )
+        await connection.execute(
+            Credential.__table__.insert().values(
+                user_id=1,
+                login="shared",
+                password="x",
+                updated_at=datetime.now(),
+            )
+        )
+    event.listen(engine.sync_engine, "checkout", on_checkout)
+    event.listen(engine.sync_engine, "checkin", on_checkin)
+    factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    opened = []
+
+    def open_session(**kwargs) -> AsyncSession:
+        opened.append(factory(**kwargs))
+        return opened[-1]
+
+    monkeypatch.setattr(database, "SessionFactory", open_session)
+    principal_cache.invalidate("shared")
+    used = []
+
+    app = FastAPI()
+    app.add_middleware(AuthenticationMiddleware, backend=JWTAuthentication())
+    app.add_middleware(SessionMiddleware)
+
+    @app.get("/")
+    async def handler(
+        request: Request, repository: UserRepository = Depends()
+    ):
+        user = await repository.get(request.user.id)
+        used.append(repository)
+        return {"id": user.id}
+
+    requests, checkouts = hold_stats.requests, hold_stats.checkouts
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get(
+            "/", headers={"Authorization": f"Bearer {make_token('shared')}"}
+        )
+
+    assert response.json() == {"id": 1}
+    # the principal was loaded by the middleware, not taken from cache
+    assert principal_cache.get("shared").id == 1
+    assert len(opened) == 1
+    assert used[0].session is opened[0]
+    assert used[0].read_session is opened[0]
+    assert response.headers["Server-Timing"].startswith("db;dur=")
+    assert hold_stats.requests == requests + 1
+    assert hold_stats.checkouts == checkouts + 1
+    assert not opened[0].in_transaction()
+    principal_cache.invalidate("shared")
+    await engine.dispose()
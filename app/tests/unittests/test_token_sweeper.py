@@ -0,0 +1,27 @@
+from app.services.auth_services import hash_key
+from app.services.token_sweeper import RefreshTokenSweeper
+
+
+class CountingSweeper(RefreshTokenSweeper):
+    def __init__(self, batch_size: int, expired: int) -> None:
+        super().__init__(batch_size)
+        self.expired = expired
+        self.batches: list[int] = []
+
+    async def delete_batch(self) -> int:
+        count = min(self.batch_size, self.expired)
+        self.expired -= count
+        self.batches.append(count)
+        return count
+
+
+async def test_sweep_deletes_in_bounded_batches():
+    sweeper = CountingSweeper(batch_size=100, expired=250)
+
+    assert await sweeper.sweep() == 250
+    assert sweeper.batches == [100, 100, 50]
+    assert sweeper.stats()["deleted"] == 250
+
+
+def test_refresh_key_hash_is_fixed_length():
+    assert len(hash_key("a")) == len(hash_key("b" * 500)) == 64
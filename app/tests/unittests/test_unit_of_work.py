@@ -0,0 +1,72 @@
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.models.user_model import User
+from app.repositories.unit_of_work import UnitOfWork
+from app.repositories.user_repository import UserRepository
+
+USER = {
+    "first_name": "first",
+    "last_name": "last",
+    "birth_date": date(2000, 1, 1),
+    "updated_at": datetime(2023, 1, 1),
+}
+
+
+@pytest.fixture
+async def session():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    commits = []
+    event.listen(engine.sync_engine, "commit", commits.append)
+    async with engine.begin() as connection:
+        await connection.run_sync(lambda sync: User.__table__.create(sync))
+    commits.clear()
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        session.info["commits"] = commits
+        yield session
+    await engine.dispose()
+
+
+async def names(session: AsyncSession) -> list[str]:
+    result = await session.execute(select(User.first_name).order_by(User.id))
+    return result.scalars().all()
+
+
+async def test_unit_of_work_commits_once(session):
+    repository = UserRepository(session)
+
+    async with UnitOfWork(session):
+        await repository.create(USER)
+        await repository.create({**USER, "first_name": "second"})
+
+    assert len(session.info["commits"]) == 1
+    assert await names(session) == ["first", "second"]
+
+
+async def test_unit_of_work_rolls_back_on_error(session):
+    repository = UserRepository(session)
+
+    with pytest.raises(RuntimeError):
+        async with UnitOfWork(session):
+            await repository.create(USER)
+            raise RuntimeError
+
+    assert session.info["commits"] == []
+    assert await names(session) == []
+
+
+async def test_nested_unit_of_work_uses_savepoint(session):
+    repository = UserRepository(session)
+
+    async with UnitOfWork(session) as uow:
+        await repository.create(USER)
+        with pytest.raises(RuntimeError):
+            async with uow.savepoint():
+                await repository.create({**USER, "first_name": "second"})
+                raise RuntimeError
+
+    assert len(session.info["commits"]) == 1
+    assert await names(session) == ["first"]
@@ -0,0 +1,67 @@
+"""
+Compare access token decode throughput with and without the verified
+payload cache used by JWTAuthentication
+
+    $ python -m benchmarks.bench_jwt_decode
+"""
+import os
+import timeit
+from datetime import datetime, timedelta
+
+for name, value in {
+    "DATABASE_HOST": "localhost",
+    "DATABASE_DB": "bench",
+    "DATABASE_PORT": "5432",
+    "DATABASE_USER": "bench",
+    "DATABASE_PASSWORD": "bench",
+    "SECRET_KEY": "bench-secret",
+    "HASH_ALGORITHM": "HS256",
+    "ACCESS_TOKEN_LIFETIME": "5",
+    "REFRESH_TOKEN_LIFETIME": "60",
+}.items():
+    os.environ.setdefault(name, value)
+
+from jose import jwt  # noqa: E402
+
+from app.middlewares.authentication import (  # noqa: E402
+    JWTAuthentication,
+    token_cache,
+)
+
+NUMBER = 20000
+
+
+def main() -> None:
+    backend = JWTAuthentication()
+    settings = backend.settings
+    token = jwt.encode(
+        {
+            "user": "bench",
+            "uid": 1,
+            "expiration_date": datetime.timestamp(
+                datetime.utcnow() + timedelta(minutes=5)
+            ),
+        },
+        settings.SECRET_KEY,
+        settings.HASH_ALGORITHM,
+    )
+
+    def uncached():
+        jwt.decode(
+            token, settings.SECRET_KEY, algorithms=settings.HASH_ALGORITHM
+        )
+
+    def cached():
+        backend.decode(token)
+
+    token_cache.clear()
+    for name, func in (("jose.jwt.decode", uncached), ("cached", cached)):
+        seconds = min(timeit.repeat(func, number=NUMBER, repeat=3))
+        print(
+            f"{name:>16}: {NUMBER / seconds:12,.0f} decodes/s "
+            f"({seconds / NUMBER * 1e6:.2f} us/decode)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Compare serialization time of a 1k-row posts page: FastAPI's default path
+(response_model validation, jsonable_encoder, json.dumps) versus rows
+validated once and rendered by ORJSONResponse
+
+    $ python -m benchmarks.bench_serialization
+"""
+import json
+import os
+import timeit
+from datetime import datetime, timedelta
+
+for name, value in {
+    "DATABASE_HOST": "localhost",
+    "DATABASE_DB": "bench",
+    "DATABASE_PORT": "5432",
+    "DATABASE_USER": "bench",
+    "DATABASE_PASSWORD": "bench",
+    "SECRET_KEY": "bench-secret",
+    "HASH_ALGORITHM": "HS256",
+    "ACCESS_TOKEN_LIFETIME": "5",
+    "REFRESH_TOKEN_LIFETIME": "60",
+}.items():
+    os.environ.setdefault(name, value)
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import ORJSONResponse  # noqa: E402
+
+from app.mixins import keyset_page  # noqa: E402
+from app.models.post_model import Post  # noqa: E402
+from app.schemas.post_schema import PostPaginationSchema  # noqa: E402
+
+ROWS = 1000
+NUMBER = 20
+
+
+def make_posts() -> list[Post]:
+    started = datetime(2023, 1, 1)
+    return [
+        Post(
+            id=ROWS - i,
+            header=f"header {i}",
+            body="body " * 40,
+            owner=i % 50,
+            like_count=i,
+            created_at=started - timedelta(minutes=i),
+        )
+        for i in range(ROWS + 1)
+    ]
+
+
+def main() -> None:
+    posts = make_posts()
+
+    def default_path():
+        page = keyset_page(posts, ROWS)
+        validated = PostPaginationSchema(**page)
+        json.dumps(jsonable_encoder(validated)).encode()
+
+    def fast_path():
+        ORJSONResponse(keyset_page(posts, ROWS))
+
+    for name, func in (("default", default_path), ("orjson", fast_path)):
+        seconds = min(timeit.repeat(func, number=NUMBER, repeat=3))
+        print(f"{name:>16}: {seconds / NUMBER * 1000:8.2f} ms/page")
+
+
+if __name__ == "__main__":
+    main()
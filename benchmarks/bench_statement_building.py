@@ -0,0 +1,101 @@
+"""
+Compare statement building CPU per request, building Core statements
+on every call versus the cached templates of BaseSqlAlchemyRepository.
+Each request does get, update, all and count, and the cache key is
+generated as the session does on execute
+
+    $ python -m benchmarks.bench_statement_building
+"""
+import asyncio
+import os
+import timeit
+
+for name, value in {
+    "DATABASE_HOST": "localhost",
+    "DATABASE_DB": "bench",
+    "DATABASE_PORT": "5432",
+    "DATABASE_USER": "bench",
+    "DATABASE_PASSWORD": "bench",
+    "SECRET_KEY": "bench-secret",
+    "HASH_ALGORITHM": "HS256",
+    "ACCESS_TOKEN_LIFETIME": "5",
+    "REFRESH_TOKEN_LIFETIME": "60",
+}.items():
+    os.environ.setdefault(name, value)
+
+from sqlalchemy import func, select, update  # noqa: E402
+
+from app.models.post_model import Post  # noqa: E402
+from app.repositories.post_repository import PostRepository  # noqa: E402
+
+NUMBER = 5000
+
+
+class CacheKeySession:
+    """
+    Stands in for AsyncSession, only generates the statement cache key
+    """
+
+    def __init__(self) -> None:
+        self.info: dict = {}
+
+    async def execute(self, query, params=None):
+        query._generate_cache_key()
+        return self
+
+    async def commit(self):
+        pass
+
+    def scalars(self):
+        return self
+
+    def one(self):
+        pass
+
+    def all(self):
+        return []
+
+    def scalar_one(self):
+        return 0
+
+
+def build_per_call() -> None:
+    base_select = PostRepository.base_select
+    for query in (
+        base_select.where(Post.id == 1),
+        update(Post)
+        .filter(Post.id == 1)
+        .returning(Post)
+        .values(header="header", body="body"),
+        base_select.limit(20).offset(40),
+        select(func.count())
+        .select_from(Post)
+        .where(Post.deleted_at.is_(None)),
+    ):
+        query._generate_cache_key()
+
+
+async def templates(repository: PostRepository) -> None:
+    await repository.get(1)
+    await repository.update(1, {"header": "header", "body": "body"})
+    await repository.all(20, 40)
+    await repository.count()
+
+
+def main() -> None:
+    repository = PostRepository(CacheKeySession())
+    loop = asyncio.new_event_loop()
+    for name, func_ in (
+        ("build per call", build_per_call),
+        ("templates", lambda: loop.run_until_complete(templates(repository))),
+    ):
+        seconds = min(timeit.repeat(func_, number=NUMBER, repeat=3))
+        print(
+            f"{name:>16}: {seconds / NUMBER * 1e6:8.2f} us/request "
+            f"({NUMBER / seconds:10,.0f} requests/s)"
+        )
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""add post search vector
+
+Revision ID: 0a6c2f8e71b3
+Revises: f3a81c6e9d52
+Create Date: 2023-03-02 19:47:55.208716
+
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+# revision identifiers, used by Alembic.
+revision = "0a6c2f8e71b3"
+down_revision = "f3a81c6e9d52"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "sn_post",
+        sa.Column(
+            "search_vector",
+            TSVECTOR,
+            sa.Computed(
+                "setweight(to_tsvector('english', coalesce(header, '')), 'A')"
+                " || setweight(to_tsvector('english', coalesce(body, '')), 'B')",
+                persisted=True,
+            ),
+        ),
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_sn_post_search_vector",
+            "sn_post",
+            ["search_vector"],
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_sn_post_search_vector",
+            table_name="sn_post",
+            postgresql_concurrently=True,
+        )
+    op.drop_column("sn_post", "search_vector")
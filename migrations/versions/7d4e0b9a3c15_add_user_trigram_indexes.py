@@ -0,0 +1,38 @@
+"""add user trigram indexes
+
+Revision ID: 7d4e0b9a3c15
+Revises: 0a6c2f8e71b3
+Create Date: 2023-03-04 16:22:08.374119
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "7d4e0b9a3c15"
+down_revision = "0a6c2f8e71b3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    with op.get_context().autocommit_block():
+        for column in ("first_name", "last_name"):
+            op.create_index(
+                f"ix_sn_user_{column}_trgm",
+                "sn_user",
+                [column],
+                postgresql_using="gin",
+                postgresql_ops={column: "gin_trgm_ops"},
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for column in ("first_name", "last_name"):
+            op.drop_index(
+                f"ix_sn_user_{column}_trgm",
+                table_name="sn_user",
+                postgresql_concurrently=True,
+            )
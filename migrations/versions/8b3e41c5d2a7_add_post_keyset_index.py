@@ -0,0 +1,35 @@
+"""add post keyset index
+
+Revision ID: 8b3e41c5d2a7
+Revises: 4c0b50da81fc
+Create Date: 2023-02-20 19:12:44.103521
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "8b3e41c5d2a7"
+down_revision = "4c0b50da81fc"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_sn_post_created_at_id",
+            "sn_post",
+            [sa.text("created_at DESC"), sa.text("id DESC")],
+            postgresql_where=sa.text("deleted_at IS NULL"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_sn_post_created_at_id",
+            table_name="sn_post",
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,64 @@
+"""hash refresh token keys
+
+Revision ID: 9e2d7c5b1a60
+Revises: 7d4e0b9a3c15
+Create Date: 2023-03-06 11:40:52.208317
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "9e2d7c5b1a60"
+down_revision = "7d4e0b9a3c15"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "sn_refresh_token", sa.Column("key_hash", sa.String(64), nullable=True)
+    )
+    op.execute(
+        "UPDATE sn_refresh_token "
+        "SET key_hash = encode(sha256(convert_to(key, 'UTF8')), 'hex')"
+    )
+    # keep only the latest token of every owner
+    op.execute(
+        "DELETE FROM sn_refresh_token t USING sn_refresh_token newer "
+        "WHERE newer.owner = t.owner AND newer.id > t.id"
+    )
+    op.alter_column("sn_refresh_token", "key_hash", nullable=False)
+    op.drop_column("sn_refresh_token", "key")
+    with op.get_context().autocommit_block():
+        for column in ("key_hash", "owner"):
+            op.create_index(
+                f"ix_sn_refresh_token_{column}",
+                "sn_refresh_token",
+                [column],
+                unique=True,
+                postgresql_concurrently=True,
+            )
+        op.create_index(
+            "ix_sn_refresh_token_valid_until",
+            "sn_refresh_token",
+            ["valid_until"],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for column in ("valid_until", "owner", "key_hash"):
+            op.drop_index(
+                f"ix_sn_refresh_token_{column}",
+                table_name="sn_refresh_token",
+                postgresql_concurrently=True,
+            )
+    # plain keys can not be restored from hashes, old tokens are dropped
+    op.execute("DELETE FROM sn_refresh_token")
+    op.add_column(
+        "sn_refresh_token",
+        sa.Column("key", sa.String(255), nullable=False),
+    )
+    op.drop_column("sn_refresh_token", "key_hash")
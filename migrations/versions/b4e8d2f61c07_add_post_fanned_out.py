@@ -0,0 +1,54 @@
+"""add post fanned out
+
+Revision ID: b4e8d2f61c07
+Revises: 9e2d7c5b1a60
+Create Date: 2023-03-09 16:22:47.305118
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "b4e8d2f61c07"
+down_revision = "9e2d7c5b1a60"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "sn_post",
+        sa.Column(
+            "fanned_out",
+            sa.Boolean,
+            nullable=False,
+            server_default=sa.false(),
+        ),
+    )
+    # posts already pushed to some timeline, the rest are pulled on read
+    op.execute(
+        """
+        UPDATE sn_post SET fanned_out = true
+        WHERE EXISTS (
+            SELECT 1 FROM sn_timeline WHERE sn_timeline.post_id = sn_post.id
+        )
+        """
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_sn_post_pulled_owner_created_at",
+            "sn_post",
+            ["owner", sa.text("created_at DESC"), sa.text("id DESC")],
+            postgresql_where=sa.text("deleted_at IS NULL AND NOT fanned_out"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_sn_post_pulled_owner_created_at",
+            table_name="sn_post",
+            postgresql_concurrently=True,
+        )
+    op.drop_column("sn_post", "fanned_out")
@@ -0,0 +1,39 @@
+"""create revoked token
+
+Revision ID: c1f7a9e04b6d
+Revises: 8b3e41c5d2a7
+Create Date: 2023-02-22 21:05:17.640382
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c1f7a9e04b6d"
+down_revision = "8b3e41c5d2a7"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "sn_revoked_token",
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("id", sa.Integer, nullable=False, autoincrement=True),
+        sa.Column("jti", sa.String(32), nullable=False),
+        sa.Column("valid_until", sa.Float, nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("jti"),
+    )
+    op.create_index(
+        "ix_sn_revoked_token_valid_until", "sn_revoked_token", ["valid_until"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_sn_revoked_token_valid_until", table_name="sn_revoked_token"
+    )
+    op.drop_table("sn_revoked_token")
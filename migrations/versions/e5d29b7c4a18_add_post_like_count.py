@@ -0,0 +1,37 @@
+"""add post like count
+
+Revision ID: e5d29b7c4a18
+Revises: c1f7a9e04b6d
+Create Date: 2023-02-24 18:31:02.917455
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e5d29b7c4a18"
+down_revision = "c1f7a9e04b6d"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "sn_post",
+        sa.Column(
+            "like_count", sa.Integer, nullable=False, server_default="0"
+        ),
+    )
+    op.execute(
+        """
+        UPDATE sn_post SET like_count = likes.total
+        FROM (
+            SELECT post_id, count(*) AS total FROM sn_like GROUP BY post_id
+        ) AS likes
+        WHERE sn_post.id = likes.post_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("sn_post", "like_count")
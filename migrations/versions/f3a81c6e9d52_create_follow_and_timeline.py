@@ -0,0 +1,87 @@
+"""create follow and timeline
+
+Revision ID: f3a81c6e9d52
+Revises: e5d29b7c4a18
+Create Date: 2023-02-27 20:14:39.581204
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "f3a81c6e9d52"
+down_revision = "e5d29b7c4a18"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "sn_user",
+        sa.Column(
+            "follower_count", sa.Integer, nullable=False, server_default="0"
+        ),
+    )
+    op.create_table(
+        "sn_follow",
+        sa.Column(
+            "follower_id",
+            sa.Integer,
+            sa.ForeignKey("sn_user.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column(
+            "followee_id",
+            sa.Integer,
+            sa.ForeignKey("sn_user.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index(
+        "ix_sn_follow_followee_id",
+        "sn_follow",
+        ["followee_id", "follower_id"],
+    )
+    op.create_table(
+        "sn_timeline",
+        sa.Column(
+            "user_id",
+            sa.Integer,
+            sa.ForeignKey("sn_user.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column(
+            "post_id",
+            sa.Integer,
+            sa.ForeignKey("sn_post.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index(
+        "ix_sn_timeline_user_created_at",
+        "sn_timeline",
+        ["user_id", sa.text("created_at DESC"), sa.text("post_id DESC")],
+    )
+    op.create_index("ix_sn_timeline_post_id", "sn_timeline", ["post_id"])
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_sn_post_owner_created_at",
+            "sn_post",
+            ["owner", sa.text("created_at DESC"), sa.text("id DESC")],
+            postgresql_where=sa.text("deleted_at IS NULL"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_sn_post_owner_created_at",
+            table_name="sn_post",
+            postgresql_concurrently=True,
+        )
+    op.drop_table("sn_timeline")
+    op.drop_table("sn_follow")
+    op.drop_column("sn_user", "follower_count")